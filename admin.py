@@ -0,0 +1,229 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+                             QComboBox, QTableView, QHeaderView, QMessageBox)
+from PyQt6.QtCore import Qt, QTimer
+
+import database
+from models import UserPageModel
+from workers import abandon, run_task
+
+# pause after the last keystroke before the search runs
+SEARCH_DELAY_MS = 300
+
+SEARCH_MODES = ["Starts with", "Contains"]
+
+
+class AdminScreen(QWidget):
+    """Paged list of user accounts with search and bulk disable/enable/delete.
+
+    Pages are keyset pages from database.list_users, loaded on the worker
+    pool; the cursor each visited page started from is kept so Previous
+    goes back without counting rows. Bulk actions apply to the selected rows
+    of the current page, each as one transaction.
+    """
+
+    def __init__(self, back_callback):
+        super().__init__()
+        self.setObjectName("AdminScreen")
+        self.back_callback = back_callback
+        self.current_user = ""
+        self.cursors = [None]  # the `after` cursor of each page visited, current page last
+        self.next_cursor = None
+        self.page_task = None
+        self.action_task = None
+        self.action_note = ""  # result of the last bulk action, shown with the reloaded page
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(15)
+
+        title = QLabel("User Administration")
+        title.setObjectName("SectionTitle")
+        layout.addWidget(title)
+
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search usernames")
+        self.search_input.setObjectName("FilterInput")
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.first_page)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        search_layout.addWidget(self.search_input)
+        self.search_mode = QComboBox()
+        self.search_mode.addItems(SEARCH_MODES)
+        self.search_mode.currentIndexChanged.connect(self.first_page)
+        search_layout.addWidget(self.search_mode)
+        layout.addLayout(search_layout)
+
+        self.lbl_status = QLabel("")
+        self.lbl_status.setObjectName("HintLabel")
+        layout.addWidget(self.lbl_status)
+
+        self.model = UserPageModel()
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.view.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
+        self.view.verticalHeader().setVisible(False)
+        self.view.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.view.selectionModel().selectionChanged.connect(self.update_buttons)
+        layout.addWidget(self.view)
+
+        page_layout = QHBoxLayout()
+        self.btn_prev = self.make_button("Previous", "secondary", self.previous_page)
+        page_layout.addWidget(self.btn_prev)
+        self.lbl_page = QLabel("")
+        self.lbl_page.setObjectName("FieldLabel")
+        self.lbl_page.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        page_layout.addWidget(self.lbl_page, 1)
+        self.btn_next = self.make_button("Next", "secondary", self.next_page)
+        page_layout.addWidget(self.btn_next)
+        layout.addLayout(page_layout)
+
+        action_layout = QHBoxLayout()
+        btn_back = self.make_button("Back to Dashboard", "link", self.back_callback)
+        action_layout.addWidget(btn_back)
+        action_layout.addStretch()
+        self.btn_enable = self.make_button("Enable", "success", lambda: self.run_action("enable"))
+        action_layout.addWidget(self.btn_enable)
+        self.btn_disable = self.make_button("Disable", "warning", lambda: self.run_action("disable"))
+        action_layout.addWidget(self.btn_disable)
+        self.btn_delete = self.make_button("Delete", "danger", lambda: self.run_action("delete"))
+        action_layout.addWidget(self.btn_delete)
+        layout.addLayout(action_layout)
+
+        self.update_buttons()
+
+    @staticmethod
+    def make_button(text, variant, slot):
+        button = QPushButton(text)
+        button.setProperty("variant", variant)
+        button.setProperty("size", "small")
+        button.setCursor(Qt.CursorShape.PointingHandCursor)
+        button.clicked.connect(slot)
+        return button
+
+    def start_session(self, current_user):
+        """Shows the first page of all users, for an admin signing in."""
+        self.current_user = current_user
+        self.search_timer.stop()
+        self.search_input.blockSignals(True)
+        self.search_input.clear()
+        self.search_input.blockSignals(False)
+        self.search_mode.blockSignals(True)
+        self.search_mode.setCurrentIndex(0)
+        self.search_mode.blockSignals(False)
+        self.first_page()
+
+    def shutdown(self):
+        for name in ('page_task', 'action_task'):
+            task = getattr(self, name)
+            if task:
+                abandon(task)
+                setattr(self, name, None)
+        self.model.set_rows([])
+        self.update_buttons()
+
+    # paging
+    def first_page(self):
+        self.search_timer.stop()
+        self.cursors = [None]
+        self.load_page()
+
+    def next_page(self):
+        if self.next_cursor is not None:
+            self.cursors.append(self.next_cursor)
+            self.load_page()
+
+    def previous_page(self):
+        if len(self.cursors) > 1:
+            self.cursors.pop()
+            self.load_page()
+
+    @staticmethod
+    def page_job(search, contains, after):
+        # the first page loaded builds the search index if it is missing
+        database.ensure_search_index()
+        return database.list_users(search, contains, after)
+
+    def load_page(self):
+        """(Re)loads the page starting at the last cursor in self.cursors."""
+        if self.page_task:
+            abandon(self.page_task)
+        contains = self.search_mode.currentIndex() == 1
+        self.page_task = run_task(self.page_job, self.search_input.text(), contains, self.cursors[-1],
+                                  on_done=self.on_page_ready, on_error=self.on_page_error)
+        self.lbl_status.setText("Loading...")
+        self.update_buttons()
+
+    def is_current_page(self):
+        # results already queued by an abandoned load can still arrive
+        return self.page_task is not None and self.sender() is self.page_task.signals
+
+    def on_page_ready(self, result):
+        if not self.is_current_page():
+            return
+        self.page_task = None
+        rows, self.next_cursor = result
+        self.model.set_rows(rows)
+        self.lbl_page.setText(f"Page {len(self.cursors)}")
+        disabled = sum(1 for _, is_disabled in rows if is_disabled)
+        status = f"{len(rows)} users on this page, {disabled} disabled" if rows else "No users match"
+        self.lbl_status.setText(self.action_note + status)
+        self.action_note = ""
+        self.update_buttons()
+
+    def on_page_error(self, error):
+        if not self.is_current_page():
+            return
+        self.page_task = None
+        self.lbl_status.setText(f"Could not load users: {error}")
+        self.update_buttons()
+
+    # bulk actions
+    def selected_usernames(self):
+        return [self.model.username(index.row()) for index in self.view.selectionModel().selectedRows()]
+
+    def update_buttons(self):
+        self.btn_prev.setEnabled(len(self.cursors) > 1 and self.page_task is None)
+        self.btn_next.setEnabled(self.next_cursor is not None and self.page_task is None)
+        can_act = self.action_task is None and self.view.selectionModel().hasSelection()
+        for button in (self.btn_enable, self.btn_disable, self.btn_delete):
+            button.setEnabled(can_act)
+
+    @staticmethod
+    def action_job(action, usernames):
+        if action == "delete":
+            return action, database.delete_users(usernames)
+        return action, database.set_disabled(usernames, action == "disable")
+
+    def run_action(self, action):
+        usernames = self.selected_usernames()
+        if action != "enable" and self.current_user in usernames:
+            QMessageBox.warning(self, "Not Allowed", f"You cannot {action} the account you are signed in with.")
+            return
+        if not usernames or self.action_task:
+            return
+        if action == "delete":
+            answer = QMessageBox.question(self, "Delete Users",
+                                          f"Delete {len(usernames)} selected users? This cannot be undone.")
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+        self.action_task = run_task(self.action_job, action, usernames,
+                                    on_done=self.on_action_done, on_error=self.on_action_error)
+        self.update_buttons()
+
+    def on_action_done(self, result):
+        self.action_task = None
+        action, count = result
+        past = {"delete": "Deleted", "disable": "Disabled", "enable": "Enabled"}[action]
+        self.action_note = f"{past} {count} users. "
+        # the page may now be short or differ, so read it again from the same cursor
+        self.load_page()
+
+    def on_action_error(self, error):
+        self.action_task = None
+        self.update_buttons()
+        QMessageBox.critical(self, "Error", f"Could not update users: {error}")
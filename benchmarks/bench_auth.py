@@ -0,0 +1,64 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import database
+
+
+# the old connect-per-call login, kept here for comparison
+def legacy_check_credentials(db_path, username, password):
+    hashed_password = database.hash_password(password)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT password FROM users WHERE username=?", (username,))
+    result = cursor.fetchone()
+    conn.close()
+    return bool(result and result[0] == hashed_password)
+
+
+def seed(users):
+    database.initialize_db()
+    conn = database.get_connection()
+    with conn:
+        conn.executemany(database.SQL_INSERT_USER,
+                         ((f"user{i}", database.hash_password(f"pass{i}")) for i in range(users)))
+
+
+def run(label, fn, logins, users):
+    start = time.perf_counter()
+    for i in range(logins):
+        n = i % users
+        fn(f"user{n}", f"pass{n}")
+    elapsed = time.perf_counter() - start
+    print(f"{label:<20} {logins / elapsed:>12,.0f} logins/s")
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare connect-per-call vs pooled logins")
+    parser.add_argument("--logins", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_NAME = os.path.join(tmp, "bench_users.db")
+        seed(args.users)
+
+        legacy = run("connect-per-call", lambda u, p: legacy_check_credentials(database.DB_NAME, u, p),
+                     args.logins, args.users)
+        cache = database.credential_cache
+        database.credential_cache = database.CredentialCache(size=0, negative_size=0)
+        pooled = run("pooled", database.check_credentials, args.logins, args.users)
+        database.credential_cache = cache
+        cached = run("pooled + cache", database.check_credentials, args.logins, args.users)
+        print(f"speedup: {pooled / legacy:.1f}x pooled, {cached / legacy:.1f}x with cache")
+        print(f"cache: {cache.stats()}")
+        database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import identity_store
+from identity_gen import FIELDNAMES, get_faker, make_identity
+
+# distinct Faker identities; rows cycle through them with a numbered email
+POOL = 1000
+LOOKUPS = 1000
+
+
+def write_csv(path, rows):
+    fake = get_faker()
+    fake.seed_instance(0)
+    pool = [make_identity(fake) for _ in range(POOL)]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for i in range(rows):
+            row = dict(pool[i % POOL])
+            row["Email"] = f"{i}.{row['Email']}"
+            writer.writerow(row)
+    return pool
+
+
+def per_op(label, fn, ops):
+    start = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    elapsed = (time.perf_counter() - start) / ops
+    print(f"{label:<28} {elapsed * 1000:10.3f} ms/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Identity store: CSV import, lookups, aggregates and export")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "generated_data.csv")
+        pool = write_csv(csv_path, args.rows)
+
+        store = identity_store.IdentityStore(os.path.join(tmp, "identities.db"))
+        start = time.perf_counter()
+        store.import_csv(csv_path)
+        elapsed = time.perf_counter() - start
+        print(f"{'import_csv':<28} {args.rows / elapsed:10,.0f} rows/s  ({elapsed:.1f} s for {args.rows:,})")
+
+        step = max(1, args.rows // LOOKUPS)
+        per_op("find_email (hit)", lambda i: store.find_email(f"{i * step}.{pool[i * step % POOL]['Email']}"), LOOKUPS)
+        per_op("find_email (miss)", lambda i: store.find_email(f"missing{i}@example.com"), LOOKUPS)
+        per_op("find_name prefix, limit 10",
+               lambda i: store.find_name(pool[i % POOL]["Name"][:3], prefix=True, limit=10), LOOKUPS)
+        per_op("count_by_job", lambda i: store.count_by_job(), 100)
+        per_op("count", lambda i: store.count(), LOOKUPS)
+
+        # before add_rows, so the export holds the same rows as the CSV it is compared with
+        out = os.path.join(tmp, "identities.sic")
+        start = time.perf_counter()
+        exported = store.export(out)
+        elapsed = time.perf_counter() - start
+        print(f"{'export (columnar, zlib)':<28} {exported / elapsed:10,.0f} rows/s"
+              f"  ({os.path.getsize(out) / os.path.getsize(csv_path):.0%} of the CSV size)")
+
+        start = time.perf_counter()
+        store.add_rows(dict(pool[i % POOL], Email=f"extra{i}@example.com") for i in range(100_000))
+        elapsed = time.perf_counter() - start
+        print(f"{'add_rows (indexed table)':<28} {100_000 / elapsed:10,.0f} rows/s")
+
+        start = time.perf_counter()
+        added = store.import_csv(csv_path)
+        elapsed = time.perf_counter() - start
+        print(f"{'import_csv again (skipped)':<28} {args.rows / elapsed:10,.0f} rows/s  ({added:,} added)")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import identity_gen
+from identity_gen import make_identity, parse_locales
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Faker set-up and per-identity cost for each locale")
+    parser.add_argument("--locales", default="en_US,en_PH,ja_JP")
+    parser.add_argument("--mix", default=identity_gen.DEFAULT_LOCALE_MIX)
+    parser.add_argument("--identities", type=int, default=5000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    import faker  # noqa: F401  (shared by every locale, so timed on its own)
+    print(f"{'import faker':<24} {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+    print(f"\n{'locale':<24} {'first Faker()':>14} {'pooled':>10} {'per identity':>14}")
+    for locale, _ in parse_locales(args.locales):
+        start = time.perf_counter()
+        fake = identity_gen.get_faker(locale)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        identity_gen.get_faker(locale)
+        pooled = time.perf_counter() - start
+
+        fake.seed_instance(0)
+        start = time.perf_counter()
+        for _ in range(args.identities):
+            make_identity(fake)
+        per = (time.perf_counter() - start) / args.identities
+        print(f"{locale:<24} {first * 1000:11.1f} ms {pooled * 1e6:7.1f} us {per * 1e6:11.1f} us")
+
+    # a weighted mix, as a batch generates it: a locale drawn per row
+    mix = parse_locales(args.mix)
+    identity_gen._init_worker(mix)
+    start = time.perf_counter()
+    identity_gen._generate_chunk(0, 0, args.identities, mix)
+    per = (time.perf_counter() - start) / args.identities
+    print(f"\nmix {identity_gen.format_locales(mix)}: {per * 1e6:.1f} us per identity (single thread)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import database
+import metrics
+
+
+def per_call(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn("bench", "password123")
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of the metrics layer on a cached login")
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_NAME = os.path.join(tmp, "bench_users.db")
+        database.initialize_db()
+        database.add_new_user("bench", "password123")
+        database.check_credentials("bench", "password123")
+
+        # a cache hit is the cheapest instrumented call, so overhead shows most here
+        bare = per_call(database.check_credentials.__wrapped__, args.calls)
+        metrics.disable()
+        off = per_call(database.check_credentials, args.calls)
+        metrics.enable()
+        on = per_call(database.check_credentials, args.calls)
+        metrics.disable()
+        database.close_connections()
+
+    print(f"{'uninstrumented':<20} {bare * 1e9:8.0f} ns/call")
+    print(f"{'metrics disabled':<20} {off * 1e9:8.0f} ns/call  (+{(off - bare) * 1e9:.0f} ns)")
+    print(f"{'metrics enabled':<20} {on * 1e9:8.0f} ns/call  (+{(on - bare) * 1e9:.0f} ns)")
+
+
+if __name__ == "__main__":
+    main()
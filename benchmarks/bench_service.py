@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import database
+import service
+
+
+async def call(reader, writer, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+    await reader.readexactly(length)
+    return head.split(b" ", 2)[1]
+
+
+async def client(port, requests, latencies):
+    """One keep-alive connection logging in `requests` times."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for i in range(requests):
+        start = time.perf_counter()
+        status = await call(reader, writer, "POST", "/login", {"username": f"user{i % 100}", "password": f"pass{i % 100}"})
+        latencies.append(time.perf_counter() - start)
+        assert status == b"200", status
+    writer.close()
+
+
+async def stream_identities(port, count):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET /identities?count={count}&seed=1 HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    body = await reader.read()
+    writer.close()
+    return body.count(b'{"Name"')
+
+
+async def run(args):
+    svc = service.Service(workers=args.workers)
+    server = await svc.start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    await svc.run_blocking(seed_users)
+    try:
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*(client(port, args.requests, latencies) for _ in range(args.clients)))
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        total = args.clients * args.requests
+        print(f"login: {args.clients} clients x {args.requests} requests  {total / elapsed:,.0f} req/s  "
+              f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms  p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        rows = await stream_identities(port, args.identities)
+        print(f"identities: streamed {rows:,} rows  {rows / (time.perf_counter() - start):,.0f} rows/s")
+    finally:
+        server.close()
+        await server.wait_closed()
+        svc.close()
+
+
+def seed_users():
+    conn = database.get_connection()
+    with conn:
+        conn.executemany(database.SQL_INSERT_USER,
+                         ((f"user{i}", database.hash_password(f"pass{i}")) for i in range(100)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent clients against the asyncio service")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--workers", type=int, default=service.EXECUTOR_WORKERS)
+    parser.add_argument("--identities", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_NAME = os.path.join(tmp, "bench_users.db")
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import shortener
+
+
+def expected_short(url):
+    return "http://short.test/" + hashlib.sha1(url.encode()).hexdigest()[:8]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Offline stand-in for TinyURL's api-create.php. Fails every Nth request with a 503."""
+
+    latency = 0.02
+    fail_every = 10
+    requests_seen = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with StandInHandler.lock:
+            StandInHandler.requests_seen += 1
+            fail = self.fail_every and StandInHandler.requests_seen % self.fail_every == 0
+        time.sleep(self.latency)
+        query = parse_qs(urlsplit(self.path).query)
+        if fail or "url" not in query:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = expected_short(query["url"][0]).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def report(label, count, elapsed):
+    print(f"{label:<28} {count / elapsed:>10,.0f} urls/s  ({elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch URL shortening against a local stand-in server")
+    parser.add_argument("--urls", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=shortener.BATCH_WORKERS)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_port}/api-create.php"
+    urls = [f"https://example.com/page/{i}" for i in range(args.urls)]
+
+    try:
+        # one-at-a-time, new connection per request (the old run_shortener path)
+        StandInHandler.fail_every = 0
+        start = time.perf_counter()
+        for url in urls:
+            requests.get(api_url, params={"url": url}, timeout=5)
+        report("sequential, no reuse", len(urls), time.perf_counter() - start)
+
+        StandInHandler.fail_every = 10
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = shortener.UrlCache(os.path.join(tmp, "url_cache.db"))
+            backend = shortener.TinyUrlBackend(api_url, pool_size=args.workers)
+            for label in ("batch, cold cache", "batch, warm cache"):
+                start = time.perf_counter()
+                results = list(shortener.shorten_many(urls, cache, backend, workers=args.workers, backoff=0.01))
+                report(label, len(urls), time.perf_counter() - start)
+
+                errors = [r for r in results if r[3]]
+                wrong = [r for r in results if r[2] and r[2] != expected_short(r[1])]
+                assert not errors, errors[:3]
+                assert not wrong, wrong[:3]
+                assert sorted(r[0] for r in results) == list(range(len(urls)))
+            print(f"cache: {cache.stats()}")
+            backend.close()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sms_log
+
+
+# the old open/append/close-per-message path, kept here for comparison
+def legacy_log(path, number, msg):
+    with open(path, "a") as f:
+        f.write(sms_log.format_entry(number, msg))
+
+
+def run(label, fn, messages):
+    start = time.perf_counter()
+    for i in range(messages):
+        fn("+639171234567", f"benchmark message {i}")
+    return report(label, messages, time.perf_counter() - start)
+
+
+def report(label, messages, elapsed):
+    print(f"{label:<24} {messages / elapsed:>12,.0f} msgs/s")
+    return messages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SMS log throughput: per-message open vs batched writer")
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--segment-bytes", type=int, default=1 << 20, help="segment size for the tail test")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "legacy.txt")
+        run("open-per-message", lambda n, m: legacy_log(path, n, m), args.messages)
+
+        for durability in (sms_log.DURABILITY_NONE, sms_log.DURABILITY_FLUSH, sms_log.DURABILITY_FSYNC):
+            writer = sms_log.SmsLogWriter(os.path.join(tmp, f"{durability}.txt"), durability=durability)
+            start = time.perf_counter()
+            for i in range(args.messages):
+                writer.log("+639171234567", f"benchmark message {i}")
+            writer.close()
+            report(f"writer ({durability})", args.messages, time.perf_counter() - start)
+            print(f"{'':<24} {writer.batches_written:>12,} batches")
+
+        # tail() should not slow down as sealed segments pile up
+        path = os.path.join(tmp, "segmented.txt")
+        writer = sms_log.SmsLogWriter(path, durability=sms_log.DURABILITY_NONE, index=False,
+                                      segment_bytes=args.segment_bytes)
+        for i in range(args.messages * 4):
+            writer.log("+639171234567", f"benchmark message {i}")
+        writer.close()
+        start = time.perf_counter()
+        for _ in range(100):
+            sms_log.tail(path, 100)
+        elapsed = (time.perf_counter() - start) / 100
+        print(f"{'tail(100)':<24} {elapsed * 1000:>12.3f} ms  ({writer.segments_sealed} sealed segments)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QLineEdit, QPushButton, QVBoxLayout, QWidget
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import theme
+
+# the per-widget sheets the dashboard used before the app-level theme
+BUTTON_STYLE = """
+    QPushButton { background-color: #718093; color: white; padding: 12px; border-radius: 10px; font-weight: bold; outline: 0;}
+    QPushButton:hover { background-color: #7f8fa6; }
+"""
+COPIED_STYLE = """
+    QPushButton { background-color: #4cd137; color: white; padding: 12px; border-radius: 10px; font-weight: bold; outline: 0;}
+"""
+INPUT_STYLE = "padding: 14px; border: 2px solid #353b48; border-radius: 10px; color: #f5f6fa; font-size: 14px; background: #2f3640;"
+
+
+def build(count, inline):
+    """A page of `count` button + input pairs, styled per widget or via the theme."""
+    page = QWidget()
+    layout = QVBoxLayout(page)
+    buttons = []
+    for i in range(count):
+        btn = QPushButton(f"Button {i}")
+        edit = QLineEdit()
+        if inline:
+            btn.setStyleSheet(BUTTON_STYLE)
+            edit.setStyleSheet(INPUT_STYLE)
+        else:
+            btn.setProperty("variant", "secondary")
+            edit.setObjectName("ToolInput")
+        layout.addWidget(btn)
+        layout.addWidget(edit)
+        buttons.append(btn)
+    return page, buttons
+
+
+def polish(app, page):
+    """Time to first show (style resolution and polish happen here)."""
+    start = time.perf_counter()
+    page.show()
+    app.processEvents()
+    return time.perf_counter() - start
+
+
+def toggle(app, buttons, inline, rounds):
+    start = time.perf_counter()
+    for i in range(rounds):
+        btn = buttons[i % len(buttons)]
+        if inline:
+            btn.setStyleSheet(COPIED_STYLE)
+            btn.setStyleSheet(BUTTON_STYLE)
+        else:
+            theme.set_property(btn, "state", "copied")
+            theme.set_property(btn, "state", None)
+    app.processEvents()
+    return (time.perf_counter() - start) / (rounds * 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-widget stylesheets vs the app-level theme")
+    parser.add_argument("--widgets", type=int, default=200, help="button + input pairs per page")
+    parser.add_argument("--toggles", type=int, default=2000, help="state changes to time")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    theme.apply(app)
+    for label, inline in (("per-widget setStyleSheet", True), ("app theme + properties", False)):
+        page, buttons = build(args.widgets, inline)
+        polish_time = polish(app, page)
+        toggle_time = toggle(app, buttons, inline, args.toggles)
+        print(f"{label:<26} polish {polish_time * 1000:8.1f} ms   state change {toggle_time * 1e6:8.1f} us")
+        page.close()
+        page.deleteLater()
+        app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import database
+
+PAGES = 200
+
+
+def seed(users, start):
+    conn = database.get_connection()
+    with conn:
+        # hashing is irrelevant here, every account shares one stored password
+        conn.executemany(database.SQL_INSERT_USER,
+                         ((f"user{i:07d}", "x" * 64) for i in range(start, users)))
+
+
+def per_page(fn):
+    start = time.perf_counter()
+    for i in range(PAGES):
+        fn(i)
+    return (time.perf_counter() - start) / PAGES * 1000
+
+
+def offset_page(offset):
+    return database.get_connection().execute(
+        "SELECT username, disabled FROM users ORDER BY username LIMIT ? OFFSET ?",
+        (database.USERS_PAGE_SIZE, offset)).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admin user list: keyset pages and search as the table grows")
+    parser.add_argument("--sizes", default="10000,100000,500000")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_NAME = os.path.join(tmp, "bench_users.db")
+        database.initialize_db()
+        # built up front, as the admin screen does, so seeding goes through its triggers
+        database.ensure_search_index()
+        print(f"{'users':>10} {'first page':>11} {'last page':>11} {'OFFSET last':>12}"
+              f" {'prefix':>9} {'contains':>9}   (ms per page)")
+        seeded = 0
+        for size in sizes:
+            seed(size, seeded)
+            seeded = size
+            last = f"user{size - database.USERS_PAGE_SIZE - 1:07d}"
+            first_ms = per_page(lambda i: database.list_users())
+            last_ms = per_page(lambda i: database.list_users(after=last))
+            offset_ms = per_page(lambda i: offset_page(size - database.USERS_PAGE_SIZE))
+            prefix_ms = per_page(lambda i: database.list_users(f"user{i % 10}"))
+            contains_ms = per_page(lambda i: database.list_users(f"{i % 1000:03d}5", contains=True))
+            print(f"{size:>10,} {first_ms:11.3f} {last_ms:11.3f} {offset_ms:12.3f}"
+                  f" {prefix_ms:9.3f} {contains_ms:9.3f}")
+
+        usernames = [f"user{i:07d}" for i in range(0, seeded, max(1, seeded // 10_000))]
+        start = time.perf_counter()
+        database.set_disabled(usernames)
+        disable_s = time.perf_counter() - start
+        start = time.perf_counter()
+        database.delete_users(usernames)
+        delete_s = time.perf_counter() - start
+        print(f"\nbulk disable {len(usernames):,}: {disable_s * 1000:.1f} ms,"
+              f" bulk delete: {delete_s * 1000:.1f} ms (one transaction each)")
+        database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Headless benchmark suite with a stored baseline.
+
+    python benchmarks/suite.py                     # run, compare with benchmarks/baseline.json
+    python benchmarks/suite.py --quick             # smaller sizes, for a fast check
+    python benchmarks/suite.py --out results.json  # also keep this run's numbers
+    python benchmarks/suite.py --runs 3 --save-baseline  # accept the median of 3 runs as the baseline
+
+Everything runs on the Qt offscreen platform inside a temporary directory, so
+users.db, generated_data.csv and sms_logs.txt in the checkout are never touched.
+Exits with status 1 when a metric is worse than the baseline by more than
+--threshold (a fraction, default 0.3).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import database
+import theme
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.3
+
+# (full, quick) sizes
+SIZES = {
+    "auth_users": ([1_000, 10_000, 100_000], [1_000, 10_000]),
+    "auth_ops": (5_000, 1_000),
+    "fake_history": ([0, 10_000, 100_000], [0, 10_000]),
+    "fake_clicks": (500, 100),
+    "fake_batch": (20_000, 5_000),
+    "csv_rows": ([1_000, 100_000, 1_000_000], [1_000, 100_000]),
+    "sms_messages": (5_000, 1_000),
+}
+
+# short loops are timed this many times and the best run is kept, to damp noise
+REPEATS = 3
+
+# distinct identities to cycle through when a benchmark needs many rows
+IDENTITY_POOL = 1_000
+
+
+class QuietMessageBox:
+    """Stands in for QMessageBox so the screen's dialogs do not block the run."""
+
+    @staticmethod
+    def information(*args):
+        pass
+
+    warning = critical = information
+
+
+def best_of(fn, repeats=REPEATS):
+    """Runs fn(attempt) `repeats` times and returns the fastest wall time."""
+    times = []
+    for attempt in range(repeats):
+        start = time.perf_counter()
+        fn(attempt)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Suite:
+    def __init__(self, quick):
+        self.quick = quick
+        self.results = {}
+
+    def size(self, name):
+        return SIZES[name][1 if self.quick else 0]
+
+    def record(self, name, value, unit, higher_is_better=True):
+        self.results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+        print(f"{name:<44} {value:>14,.2f} {unit}")
+
+    # check_credentials / add_new_user against tables of different sizes
+    def bench_auth(self):
+        ops = self.size("auth_ops")
+        cache = database.credential_cache
+        # measure the database path, not the cache in front of it
+        database.credential_cache = database.CredentialCache(size=0, negative_size=0)
+        try:
+            for users in self.size("auth_users"):
+                database.DB_NAME = os.path.abspath(f"bench_users_{users}.db")
+                database.initialize_db()
+                conn = database.get_connection()
+                with conn:
+                    conn.executemany(database.SQL_INSERT_USER,
+                                     ((f"user{i}", database.hash_password(f"pass{i}")) for i in range(users)))
+
+                def logins(attempt):
+                    for i in range(ops):
+                        n = (i + attempt) * 7919 % users
+                        database.check_credentials(f"user{n}", f"pass{n}")
+                self.record(f"auth.check_credentials.users={users}", ops / best_of(logins), "ops/s")
+
+                def signups(attempt):
+                    for i in range(ops):
+                        database.add_new_user(f"new{attempt}_{i}", "password123")
+                self.record(f"auth.add_new_user.users={users}", ops / best_of(signups), "ops/s")
+                database.close_connections()
+        finally:
+            database.credential_cache = cache
+
+    # run_fake_data: single-click latency as the history grows, and batch throughput
+    def bench_fake_data(self, app, screen, pool):
+        screen.ensure_tab(2)
+        clicks = self.size("fake_clicks")
+        screen.fake_count.setValue(1)
+        for history in self.size("fake_history"):
+            screen.start_session("bench")
+            rows = [pool[i % len(pool)] for i in range(history)]
+            screen.session_data.extend(rows)
+            screen.fake_model.add_identities(rows)
+            app.processEvents()
+
+            samples = []
+            start = time.perf_counter()
+            for _ in range(clicks):
+                t0 = time.perf_counter()
+                screen.btn_gen.click()
+                app.processEvents()
+                samples.append(time.perf_counter() - t0)
+            elapsed = time.perf_counter() - start
+            self.record(f"fake_data.click.history={history}", clicks / elapsed, "clicks/s")
+            self.record(f"fake_data.click_p50_ms.history={history}", percentile(samples, 50) * 1000, "ms", False)
+            self.record(f"fake_data.click_p95_ms.history={history}", percentile(samples, 95) * 1000, "ms", False)
+
+        count = self.size("fake_batch")
+        screen.start_session("bench")
+        screen.fake_count.setValue(count)
+        start = time.perf_counter()
+        screen.btn_gen.click()
+        while screen.batch_task:
+            app.processEvents()
+            time.sleep(0.002)
+        screen.get_csv_writer().flush()
+        self.record(f"fake_data.batch.count={count}", count / (time.perf_counter() - start), "rows/s")
+        screen.fake_count.setValue(1)
+
+    # save_to_csv: how long the click blocks, and rows/s until the rows are on disk
+    def bench_save_to_csv(self, screen, pool):
+        for rows in self.size("csv_rows"):
+            screen.start_session("bench")
+            data = [pool[i % len(pool)] for i in range(rows)]
+            clicks = []
+
+            def save(attempt):
+                screen.session_data = list(data)
+                start = time.perf_counter()
+                screen.save_to_csv()
+                clicks.append(time.perf_counter() - start)
+                screen.get_csv_writer().flush()
+            elapsed = best_of(save, 1 if rows >= 1_000_000 else REPEATS)
+            self.record(f"save_to_csv.click_ms.rows={rows}", min(clicks) * 1000, "ms", False)
+            self.record(f"save_to_csv.rows={rows}", rows / elapsed, "rows/s")
+
+    # run_sms: messages per second, including getting them to disk
+    def bench_sms(self, screen):
+        screen.ensure_tab(1)
+        messages = self.size("sms_messages")
+        screen.start_session("bench")
+
+        def send(attempt):
+            for i in range(messages):
+                screen.sms_num_input.setText(f"+6391{i:08d}")
+                screen.sms_msg_input.setText(f"benchmark message {i}")
+                screen.run_sms()
+            screen.get_sms_log().flush()
+        self.record(f"run_sms.messages={messages}", messages / best_of(send), "msgs/s")
+
+    def run(self, only=None):
+        app = QApplication.instance() or QApplication(sys.argv)
+        theme.apply(app)
+        cwd = os.getcwd()
+        db_name = database.DB_NAME
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                if not only or "auth" in only:
+                    self.bench_auth()
+                if only and only == {"auth"}:
+                    return self.results
+
+                import utilities
+                from identity_gen import get_faker, make_identity
+                utilities.QMessageBox = QuietMessageBox
+                fake = get_faker()
+                fake.seed_instance(0)
+                pool = [make_identity(fake) for _ in range(IDENTITY_POOL)]
+
+                screen = utilities.UtilityScreen(lambda: None, "bench")
+                screen.resize(900, 650)
+                screen.show()
+                app.processEvents()
+                try:
+                    if not only or "fake_data" in only:
+                        self.bench_fake_data(app, screen, pool)
+                    if not only or "save_to_csv" in only:
+                        self.bench_save_to_csv(screen, pool)
+                    if not only or "run_sms" in only:
+                        self.bench_sms(screen)
+                finally:
+                    screen.shutdown()
+                    screen.close()
+            finally:
+                database.close_connections()
+                database.DB_NAME = db_name
+                os.chdir(cwd)
+        return self.results
+
+
+def compare(results, baseline, threshold):
+    """Prints each metric against the baseline and returns the regressed names."""
+    regressions = []
+    print(f"\n{'metric':<44} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name, current in sorted(results.items()):
+        base = baseline.get(name)
+        if not base or not base["value"]:
+            print(f"{name:<44} {'-':>14} {current['value']:>14,.2f}      new")
+            continue
+        change = (current["value"] - base["value"]) / base["value"]
+        worse = -change if current["higher_is_better"] else change
+        flag = ""
+        if worse > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<44} {base['value']:>14,.2f} {current['value']:>14,.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the headless benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes (skips the 1M-row export)")
+    parser.add_argument("--only", help="comma-separated: auth, fake_data, save_to_csv, run_sms")
+    parser.add_argument("--runs", type=int, default=1, help="repeat the suite and keep each metric's median")
+    parser.add_argument("--out", help="write this run's results to a JSON file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of the baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args()
+
+    only = set(args.only.split(",")) if args.only else None
+    runs = [Suite(args.quick).run(only) for _ in range(max(1, args.runs))]
+    results = {name: dict(runs[0][name], value=statistics.median(run[name]["value"] for run in runs))
+               for name in runs[0]}
+    report = {
+        "meta": {
+            "quick": args.quick,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "runs": len(runs),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                # keep metrics this run did not cover (--only)
+                report["results"] = {**json.load(f)["results"], **results}
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nbaseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nno baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline["results"], args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    print(f"\nno regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+import bisect
+import csv
+import io
+import mmap
+import os
+import struct
+import threading
+from array import array
+
+# sidecar layout: header (magic, indexed_upto), then one uint64 start offset per data row
+ROWS_MAGIC = b"SIAROW1\0"
+ROWS_HEADER = struct.Struct("<8sQ")
+
+# bytes read per step while indexing or filtering
+SCAN_BLOCK = 4 << 20
+FILTER_BLOCK = 8 << 20
+
+
+class CsvRowIndex:
+    """Start offset of every row in a CSV file, for random access by row number.
+
+    Offsets are kept in an array and in a sidecar file next to the CSV, so
+    only rows appended since the last run are scanned on open (as with the
+    SMS log index). Rows are read back through a memory map of the CSV.
+    Quoted fields may contain newlines; a row ends at a newline outside quotes.
+
+    catch_up() may run on a worker thread while another thread reads rows.
+    """
+
+    def __init__(self, csv_path, index_path=None):
+        self.csv_path = csv_path
+        self.index_path = index_path or csv_path + ".rows"
+        self.offsets = array("Q")
+        self.indexed_upto = 0
+        self.header = []
+        self.closed = False
+        self._mm = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def _load(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, indexed_upto = ROWS_HEADER.unpack(f.read(ROWS_HEADER.size))
+                data = f.read()
+        except (OSError, struct.error):
+            return
+        if magic != ROWS_MAGIC or not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) < indexed_upto:
+            return  # stale or foreign sidecar, rebuilt by catch_up()
+        self.offsets.frombytes(data[:len(data) // 8 * 8])
+        # an interrupted append can leave offsets past the recorded end
+        while self.offsets and self.offsets[-1] >= indexed_upto:
+            self.offsets.pop()
+        self.indexed_upto = indexed_upto
+
+    def _scan(self, start):
+        """Returns (row offsets, end offset) for complete rows from `start` on."""
+        offsets = array("Q")
+        pos = start
+        row_start = None
+        quotes = 0
+        pending = b""
+        with open(self.csv_path, "rb") as f:
+            f.seek(start)
+            while True:
+                block = f.read(SCAN_BLOCK)
+                if not block:
+                    break
+                lines = (pending + block).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    if row_start is None:
+                        row_start = pos
+                    quotes += line.count(b'"')
+                    pos += len(line) + 1
+                    if not quotes & 1:
+                        offsets.append(row_start)
+                        row_start = None
+                        quotes = 0
+        # a row still open here is partially written, pick it up next time
+        return offsets, pos if row_start is None else row_start
+
+    def catch_up(self):
+        """Indexes rows appended since the last call. Returns the number of new rows."""
+        if not os.path.exists(self.csv_path):
+            return 0
+        size = os.path.getsize(self.csv_path)
+        start = self.indexed_upto
+        if size < start:
+            # the CSV was truncated or replaced, start over
+            start = 0
+        offsets, end = self._scan(start) if size > start else (array("Q"), start)
+        if start == 0 and offsets:
+            offsets.pop(0)  # the header row
+
+        with self._lock:
+            if self.closed:
+                return 0
+            if start == 0:
+                self.offsets = array("Q")
+            self.offsets.extend(offsets)
+            self.indexed_upto = end
+            self._save(rewrite=start == 0, new=offsets)
+            self._remap()
+        return len(offsets)
+
+    def _save(self, rewrite, new):
+        mode = "wb" if rewrite or not os.path.exists(self.index_path) else "r+b"
+        with open(self.index_path, mode) as f:
+            if mode == "wb":
+                f.write(ROWS_HEADER.pack(ROWS_MAGIC, 0))
+                new = self.offsets
+            f.seek(0, os.SEEK_END)
+            new.tofile(f)
+            # the end offset goes last, so a crash in between only leaves extra offsets
+            f.seek(0)
+            f.write(ROWS_HEADER.pack(ROWS_MAGIC, self.indexed_upto))
+
+    def _remap(self):
+        self._close_map()
+        if self.indexed_upto:
+            self._file = open(self.csv_path, "rb")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            first_row = self.offsets[0] if self.offsets else self.indexed_upto
+            self.header = next(csv.reader([self._mm[:first_row].decode("utf-8", errors="replace")]), [])
+
+    def _close_map(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = self._file = None
+
+    def read_rows(self, first, count):
+        """Returns rows first..first+count-1 (as lists of fields) that are indexed."""
+        with self._lock:
+            last = min(first + count, len(self.offsets))
+            if first >= last or self._mm is None:
+                return []
+            end = self.offsets[last] if last < len(self.offsets) else self.indexed_upto
+            data = self._mm[self.offsets[first]:end]
+        return list(csv.reader(io.StringIO(data.decode("utf-8", errors="replace"), newline="")))
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            self._close_map()
+
+
+def filter_rows(index, needle, first=0, last=None, block=FILTER_BLOCK):
+    """Yields lists of row numbers in [first, last) whose text contains `needle`.
+
+    Letters match regardless of case. An ASCII needle is searched for in the
+    raw bytes; one with other characters is compared row by row against the
+    decoded, lowercased text, which is slower. The CSV is read in blocks that
+    end on row boundaries through a file handle of its own, and one list is
+    yielded per block (possibly empty) so a consumer can stop early. `last`
+    defaults to the rows indexed when the scan starts.
+    """
+    text = needle.lower()
+    needle = text.encode("utf-8")
+    offsets = index.offsets
+    last = len(offsets) if last is None else min(last, len(offsets))
+    if not needle or first >= last:
+        return
+    end = offsets[last] if last < len(offsets) else index.indexed_upto
+    with open(index.csv_path, "rb") as f:
+        row = first
+        while row < last:
+            # the first row starting at or after block bytes from here
+            stop_row = max(row + 1, bisect.bisect_left(offsets, offsets[row] + block, row, last))
+            base = offsets[row]
+            stop = offsets[stop_row] if stop_row < last else end
+            f.seek(base)
+            data = f.read(stop - base)
+            if not text.isascii():
+                # bytes.lower() only folds ASCII, so compare decoded rows instead
+                bounds = [offsets[r] - base for r in range(row, stop_row)] + [stop - base]
+                yield [r for r, start, finish in zip(range(row, stop_row), bounds, bounds[1:])
+                       if text in data[start:finish].decode("utf-8", errors="replace").lower()]
+                row = stop_row
+                continue
+            data = data.lower()
+
+            matches = []
+            pos = data.find(needle)
+            while pos != -1:
+                hit = bisect.bisect_right(offsets, base + pos, row, stop_row) - 1
+                matches.append(hit)
+                # one match per row: carry on from the next row
+                if hit + 1 >= stop_row:
+                    break
+                pos = data.find(needle, offsets[hit + 1] - base)
+            yield matches
+            row = stop_row
@@ -0,0 +1,172 @@
+import csv
+import queue
+import threading
+import time
+
+import metrics
+
+# chunks of rows that may wait in the queue before write_rows() blocks
+QUEUE_SIZE = 64
+
+# flush policy: whichever comes first
+FLUSH_ROWS = 10000
+FLUSH_INTERVAL = 1.0
+
+WRITE_BUFFER = 1 << 20
+
+# how often flush() checks that the writer thread is still there
+FLUSH_POLL = 0.1
+
+_STOP = object()
+
+
+class CsvWriter:
+    """Appends dict rows to a CSV file from a background thread.
+
+    Rows arrive in chunks through a bounded queue; when the disk falls
+    behind, write_rows() blocks the producer instead of buffering more.
+    The file is opened once, in append mode, and the header is written
+    only if the file is empty at that point. A chunk's on_written callback
+    runs on the writer thread once the chunk has been flushed, and never if
+    the writer fails first.
+    """
+
+    def __init__(self, path, fieldnames, queue_size=QUEUE_SIZE, flush_rows=FLUSH_ROWS,
+                 flush_interval=FLUSH_INTERVAL, on_error=None):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+        self.rows_written = 0
+        self.error = None
+        self.closed = False
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="csv-writer", daemon=True)
+        self._thread.start()
+
+    def write_rows(self, rows, timeout=None, on_written=None):
+        """Queues a chunk of rows, blocking while the queue is full.
+
+        on_written(rows) is called once they are flushed to the file.
+        """
+        if self.error:
+            raise OSError(self.error)
+        if self.closed:
+            raise OSError("CSV writer is closed")
+        rows = list(rows)
+        self._queue.put((rows, on_written), timeout=timeout)
+
+    def flush(self, timeout=None):
+        """Blocks until everything queued so far is on disk.
+
+        Returns False on timeout and raises OSError once the writer has
+        failed. After close() everything is already on disk.
+        """
+        if self.error:
+            raise OSError(self.error)
+        if self.closed or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done, timeout=timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # a thread that dies before reaching the marker never sets it
+        while not done.wait(FLUSH_POLL):
+            if not self._thread.is_alive() or (deadline is not None and time.monotonic() >= deadline):
+                break
+        if self.error:
+            raise OSError(self.error)
+        return done.is_set()
+
+    def close(self):
+        """Drains the queue, closes the file and stops the thread."""
+        self.closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _run(self):
+        f = None
+        writer = None
+        unflushed = 0
+        last_flush = time.monotonic()
+        written = []  # (rows, on_written) written since the last flush
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    if f:
+                        f.flush()
+                        self._notify(written)
+                    break
+                if isinstance(item, threading.Event):
+                    if f:
+                        f.flush()
+                        unflushed = 0
+                        self._notify(written)
+                    item.set()
+                    continue
+                if item and item[0]:
+                    rows, on_written = item
+                    if f is None:
+                        f = open(self.path, mode='a', newline='', encoding='utf-8', buffering=WRITE_BUFFER)
+                        writer = csv.DictWriter(f, fieldnames=self.fieldnames)
+                        if f.tell() == 0:
+                            writer.writeheader()
+                    with metrics.span("csv.write_rows"):
+                        writer.writerows(rows)
+                    self.rows_written += len(rows)
+                    unflushed += len(rows)
+                    if on_written:
+                        written.append((rows, on_written))
+
+                now = time.monotonic()
+                if f and unflushed and (unflushed >= self.flush_rows or now - last_flush >= self.flush_interval):
+                    f.flush()
+                    unflushed = 0
+                    last_flush = now
+                    self._notify(written)
+        except Exception as e:
+            self.error = str(e)
+            if self.on_error:
+                self.on_error(self.error)
+            # keep draining so producers blocked on put() are released
+            while True:
+                item = self._queue.get()
+                if isinstance(item, threading.Event):
+                    item.set()
+                elif item is _STOP:
+                    break
+        finally:
+            if f:
+                f.close()
+
+    @staticmethod
+    def _notify(written):
+        for rows, on_written in written:
+            try:
+                on_written(rows)
+            except Exception:
+                pass  # the rows are in the file either way; a failing listener must not fail the writer
+        written.clear()
+
+
+def write_through(chunks, writer, on_written=None):
+    """Passes each chunk of rows to writer, then yields it on for display.
+
+    on_written is handed to CsvWriter.write_rows with every chunk.
+    """
+    try:
+        for chunk in chunks:
+            if on_written:
+                writer.write_rows(chunk, on_written=on_written)
+            else:
+                writer.write_rows(chunk)
+            yield chunk
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
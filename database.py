@@ -1,46 +1,429 @@
 import sqlite3
 import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
 
 DB_NAME = 'users.db'
 
+# tuning applied to every new connection
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA busy_timeout=5000",
+)
+
+# size of sqlite3's per-connection prepared statement cache
+STATEMENT_CACHE_SIZE = 128
+
+SQL_SELECT_PASSWORD = "SELECT password, disabled FROM users WHERE username=?"
+SQL_INSERT_USER = "INSERT INTO users (username, password) VALUES (?, ?)"
+SQL_INSERT_USER_OR_IGNORE = "INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)"
+SQL_DELETE_USER = "DELETE FROM users WHERE username=?"
+SQL_SET_DISABLED = "UPDATE users SET disabled=? WHERE username=?"
+
+# admin listing: keyset pages over the primary key, or over the search
+# table's rowid for substring matches, so page N costs the same as page 1
+SQL_PAGE_USERS = "SELECT username, disabled FROM users WHERE username > ? ORDER BY username LIMIT ?"
+# one lower bound each, so the index range starts at the prefix or the cursor
+SQL_FIRST_PREFIX = ("SELECT username, disabled FROM users WHERE username >= ? AND username < ?"
+                    " ORDER BY username LIMIT ?")
+SQL_NEXT_PREFIX = ("SELECT username, disabled FROM users WHERE username > ? AND username < ?"
+                   " ORDER BY username LIMIT ?")
+SQL_PAGE_CONTAINS = ("SELECT s.rowid, u.username, u.disabled FROM users_search s JOIN users u ON u.rowid = s.rowid"
+                     " WHERE users_search MATCH ? AND s.rowid > ? ORDER BY s.rowid LIMIT ?")
+# the same pages without the search index: a scan in rowid order
+SQL_PAGE_LIKE = ("SELECT rowid, username, disabled FROM users WHERE rowid > ? AND username LIKE ? ESCAPE '\\'"
+                 " ORDER BY rowid LIMIT ?")
+SQL_SEARCH_EXISTS = "SELECT 1 FROM sqlite_master WHERE name='users_search'"
+
+# trigram index over usernames, kept in step with users by triggers. Built
+# by ensure_search_index() on first use, since every insert then also
+# updates the index; needs FTS5 with the trigram tokenizer (SQLite 3.34+)
+SEARCH_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_search USING fts5(username, content='users', content_rowid='rowid',"
+    " tokenize='trigram')",
+    """CREATE TRIGGER IF NOT EXISTS users_search_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_search(rowid, username) VALUES (new.rowid, new.username);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_search_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_search(users_search, rowid, username) VALUES ('delete', old.rowid, old.username);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_search_au AFTER UPDATE OF username ON users BEGIN
+        INSERT INTO users_search(users_search, rowid, username) VALUES ('delete', old.rowid, old.username);
+        INSERT INTO users_search(rowid, username) VALUES (new.rowid, new.username);
+    END""",
+)
+
+# the trigram tokenizer cannot match anything shorter
+MIN_CONTAINS_LENGTH = 3
+
+USERS_PAGE_SIZE = 100
+
+# accounts that may open the user administration screen; nobody unless set
+ADMINS_ENV = "SIA_ADMINS"
+
+# one connection per thread while it runs; connections of finished threads
+# wait in _idle for the next thread instead of staying open forever
+_local = threading.local()
+_connections = []
+_idle = []
+_connections_lock = threading.Lock()
+_generation = 0
+
+# per database path, whether users_search is usable; filled in by ensure_search_index()
+_search_index = {}
+_search_lock = threading.Lock()
+
+# idle connections kept for reuse, e.g. by the next QThreadPool task
+IDLE_CONNECTIONS = 4
+
+# credential cache sizing
+CACHE_SIZE = 1024
+CACHE_TTL = 300
+NEGATIVE_CACHE_SIZE = 4096
+NEGATIVE_CACHE_TTL = 5
+
+class CredentialCache:
+    """LRU/TTL cache of verified logins plus a short-lived cache of unknown usernames.
+
+    Verified entries hold a keyed BLAKE2 digest of the password (the key is
+    random per process), so a repeat login is checked without re-hashing
+    with the stored scheme or touching SQLite, and no plain text is kept.
+    """
+
+    def __init__(self, size=CACHE_SIZE, ttl=CACHE_TTL,
+                 negative_size=NEGATIVE_CACHE_SIZE, negative_ttl=NEGATIVE_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self.negative_size = negative_size
+        self.negative_ttl = negative_ttl
+        self._key = os.urandom(32)
+        self._verified = OrderedDict()
+        self._unknown = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+
+    def _digest(self, username, password):
+        data = username.encode() + b"\0" + password.encode()
+        return hashlib.blake2b(data, key=self._key, digest_size=32).digest()
+
+    def check(self, username, password):
+        """Returns True (verified), False (known unknown user) or None (not cached)."""
+        key = (DB_NAME, username)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._verified.get(key)
+            if entry is not None:
+                digest, expires = entry
+                if expires > now and hmac.compare_digest(digest, self._digest(username, password)):
+                    self._verified.move_to_end(key)
+                    self.hits += 1
+                    return True
+            expires = self._unknown.get(key)
+            if expires is not None:
+                if expires > now:
+                    self.negative_hits += 1
+                    return False
+                del self._unknown[key]
+            self.misses += 1
+            return None
+
+    def remember_verified(self, username, password):
+        key = (DB_NAME, username)
+        with self._lock:
+            self._verified[key] = (self._digest(username, password), time.monotonic() + self.ttl)
+            self._verified.move_to_end(key)
+            while len(self._verified) > self.size:
+                self._verified.popitem(last=False)
+                self.evictions += 1
+
+    def remember_unknown(self, username):
+        key = (DB_NAME, username)
+        with self._lock:
+            self._unknown[key] = time.monotonic() + self.negative_ttl
+            self._unknown.move_to_end(key)
+            while len(self._unknown) > self.negative_size:
+                self._unknown.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, username):
+        """Drops anything cached for username. Call whenever its row changes."""
+        key = (DB_NAME, username)
+        with self._lock:
+            self._verified.pop(key, None)
+            self._unknown.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._verified.clear()
+            self._unknown.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._verified),
+                "negative_size": len(self._unknown),
+            }
+
+credential_cache = CredentialCache()
+
+def hash_password(password):
+    """Returns the stored form of a plain text password."""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+class _Lease:
+    """A thread's hold on a connection, kept in _local.
+
+    Python frees a thread's locals when the thread exits (PyQt does so after
+    every QThreadPool task), which hands the connection back through __del__.
+    """
+
+    def __init__(self, conn, path, generation):
+        self.conn = conn
+        self.path = path
+        self.generation = generation
+
+    def __del__(self):
+        try:
+            _release(self.conn, self.path, self.generation)
+        except Exception:
+            pass  # interpreter shutdown
+
+def get_connection():
+    """Returns this thread's connection to DB_NAME, opening it on first use."""
+    lease = getattr(_local, 'lease', None)
+    if lease is not None:
+        if lease.path == DB_NAME and lease.generation == _generation:
+            return lease.conn
+        _local.lease = None
+
+    conn = None
+    with _connections_lock:
+        while _idle and conn is None:
+            candidate, path = _idle.pop()
+            if path == DB_NAME:
+                conn = candidate
+            else:
+                _connections.remove(candidate)
+                candidate.close()
+    if conn is None:
+        conn = sqlite3.connect(DB_NAME, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        with _connections_lock:
+            _connections.append(conn)
+    _local.lease = _Lease(conn, DB_NAME, _generation)
+    return conn
+
+def _release(conn, path, generation):
+    with _connections_lock:
+        if generation == _generation and conn in _connections and len(_idle) < IDLE_CONNECTIONS:
+            if conn.in_transaction:
+                conn.rollback()
+            _idle.append((conn, path))
+            return
+    _close(conn)
+
+def _close(conn):
+    with _connections_lock:
+        if conn in _connections:
+            _connections.remove(conn)
+    try:
+        conn.close()
+    except sqlite3.ProgrammingError:
+        pass
+
+def close_connections():
+    """Closes every pooled connection, e.g. on shutdown or after changing DB_NAME."""
+    global _generation
+    with _connections_lock:
+        conns = list(_connections)
+        _connections.clear()
+        _idle.clear()
+        _search_index.clear()
+        _generation += 1
+    for conn in conns:
+        conn.close()
+
 def initialize_db():
-    """Creates the database table if it doesn't exist."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            username TEXT PRIMARY KEY,
-            password TEXT NOT NULL
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    """Creates the database table if it doesn't exist, and upgrades older ones.
+
+    Tables from before accounts could be disabled gain the `disabled`
+    column. The username search index is left to ensure_search_index().
+    """
+    conn = get_connection()
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                username TEXT PRIMARY KEY,
+                password TEXT NOT NULL,
+                disabled INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+        if "disabled" not in columns:
+            conn.execute("ALTER TABLE users ADD COLUMN disabled INTEGER NOT NULL DEFAULT 0")
+
+def ensure_search_index():
+    """Builds the username search index if it is missing. Returns False if this SQLite cannot.
+
+    Until the first call (the admin screen makes it when it opens) users has
+    no search triggers, so sign-ups and imports don't pay for the index.
+    """
+    ready = _search_index.get(DB_NAME)
+    if ready is None:
+        with _search_lock:
+            ready = _search_index.get(DB_NAME)
+            if ready is None:
+                ready = _search_index[DB_NAME] = _build_search_index(get_connection())
+    return ready
+
+def _build_search_index(conn):
+    if conn.execute(SQL_SEARCH_EXISTS).fetchone() is not None:
+        return True
+    try:
+        with conn:
+            for statement in SEARCH_SCHEMA:
+                conn.execute(statement)
+            conn.execute("INSERT INTO users_search(users_search) VALUES ('rebuild')")
+    except sqlite3.OperationalError:
+        # no FTS5, or no trigram tokenizer before SQLite 3.34
+        return False
+    return True
+
+def rebuild_search_index():
+    """Re-reads every username into the search index. Returns False if it was never built.
+
+    The index refers to users by rowid, which VACUUM may renumber, so run
+    this after vacuuming users.db.
+    """
+    conn = get_connection()
+    if conn.execute(SQL_SEARCH_EXISTS).fetchone() is None:
+        return False
+    with conn:
+        conn.execute("INSERT INTO users_search(users_search) VALUES ('rebuild')")
+    return True
 
+@metrics.timed("db.check_credentials")
 def check_credentials(username, password):
     """Returns True if login is correct, False otherwise."""
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute("SELECT password FROM users WHERE username=?", (username,))
-    result = cursor.fetchone()
-    conn.close()
-    
-    if result and result[0] == hashed_password:
+    cached = credential_cache.check(username, password)
+    if cached is not None:
+        metrics.inc("db.credential_cache_hits")
+        return cached
+    metrics.inc("db.credential_cache_misses")
+
+    conn = get_connection()
+    with metrics.span("db.select_password"):
+        result = conn.execute(SQL_SELECT_PASSWORD, (username,)).fetchone()
+
+    if result is None:
+        credential_cache.remember_unknown(username)
+        return False
+    if result[1]:
+        return False
+    with metrics.span("db.hash_password"):
+        hashed_password = hash_password(password)
+    if result[0] == hashed_password:
+        credential_cache.remember_verified(username, password)
         return True
     return False
 
+@metrics.timed("db.add_new_user")
 def add_new_user(username, password):
-    """Tries to add a new user. Returns True if success, False if username exists."""
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    """Tries to add a new user. Returns True if success, False if username exists.
+
+    Names listed in SIA_ADMINS count as taken, so nobody can sign up as an
+    admin; those accounts are created with setup_db.py.
+    """
+    if username in admin_users():
+        return False
+    with metrics.span("db.hash_password"):
+        hashed_password = hash_password(password)
+
+    conn = get_connection()
     try:
-        cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, hashed_password))
-        conn.commit()
+        with metrics.span("db.insert_user"), conn:
+            conn.execute(SQL_INSERT_USER, (username, hashed_password))
+        credential_cache.invalidate(username)
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
\ No newline at end of file
+
+def admin_users():
+    """Usernames allowed to manage accounts, from SIA_ADMINS (comma separated); empty if unset."""
+    return {name.strip() for name in os.environ.get(ADMINS_ENV, "").split(",") if name.strip()}
+
+def _match_phrase(text):
+    # one quoted phrase, so the text is matched literally
+    return '"' + text.replace('"', '""') + '"'
+
+def _like_pattern(text):
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+@metrics.timed("db.list_users")
+def list_users(search="", contains=False, after=None, limit=USERS_PAGE_SIZE):
+    """Returns one page of users as ([(username, disabled), ...], next_cursor).
+
+    Pass next_cursor back as `after` for the following page; it is None on
+    the last one. Without `contains` the search text is a case-sensitive
+    username prefix and pages run in username order. With it, any username
+    containing the text matches regardless of case, in the order accounts
+    were created; text shorter than MIN_CONTAINS_LENGTH is treated as a prefix.
+    Where the search index is unavailable, `contains` scans the table with
+    LIKE, which only ignores ASCII case.
+    """
+    conn = get_connection()
+    if contains and len(search) >= MIN_CONTAINS_LENGTH:
+        if ensure_search_index():
+            rows = conn.execute(SQL_PAGE_CONTAINS, (_match_phrase(search), after or 0, limit + 1)).fetchall()
+        else:
+            rows = conn.execute(SQL_PAGE_LIKE, (after or 0, _like_pattern(search), limit + 1)).fetchall()
+        page = [(username, bool(disabled)) for _, username, disabled in rows[:limit]]
+        return page, rows[limit - 1][0] if len(rows) > limit else None
+
+    if search:
+        # every username starting with `search` sorts below this bound
+        upper = search + "\U0010ffff"
+        if after is None:
+            rows = conn.execute(SQL_FIRST_PREFIX, (search, upper, limit + 1)).fetchall()
+        else:
+            rows = conn.execute(SQL_NEXT_PREFIX, (after, upper, limit + 1)).fetchall()
+    else:
+        rows = conn.execute(SQL_PAGE_USERS, (after or "", limit + 1)).fetchall()
+    page = [(username, bool(disabled)) for username, disabled in rows[:limit]]
+    return page, page[-1][0] if len(rows) > limit else None
+
+@metrics.timed("db.delete_users")
+def delete_users(usernames):
+    """Deletes the given users in one transaction. Returns how many existed."""
+    conn = get_connection()
+    with conn:
+        deleted = conn.executemany(SQL_DELETE_USER, ((username,) for username in usernames)).rowcount
+    for username in usernames:
+        credential_cache.invalidate(username)
+    return deleted
+
+@metrics.timed("db.set_disabled")
+def set_disabled(usernames, disabled=True):
+    """Disables (or re-enables) the given users in one transaction. Returns how many existed."""
+    conn = get_connection()
+    with conn:
+        changed = conn.executemany(SQL_SET_DISABLED, ((int(disabled), username) for username in usernames)).rowcount
+    for username in usernames:
+        credential_cache.invalidate(username)
+    return changed
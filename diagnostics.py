@@ -0,0 +1,85 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt6.QtCore import Qt, QTimer
+
+import metrics
+
+REFRESH_MS = 1000
+
+COLUMNS = ["Metric", "Count", "p50 ms", "p95 ms", "p99 ms"]
+
+
+class DiagnosticsPanel(QWidget):
+    """Hidden live view of metrics.registry (Ctrl+Shift+D in the main window).
+
+    Opening the panel turns metric collection on if it was off; it refreshes
+    once a second while visible.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.WindowType.Window)
+        self.setWindowTitle("Diagnostics")
+        self.setObjectName("DiagnosticsPanel")
+        self.resize(640, 420)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(12)
+
+        self.lbl_status = QLabel("")
+        self.lbl_status.setObjectName("HintLabel")
+        layout.addWidget(self.lbl_status)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        btn_reset = QPushButton("Reset")
+        btn_reset.setProperty("variant", "secondary")
+        btn_reset.setProperty("size", "small")
+        btn_reset.setCursor(Qt.CursorShape.PointingHandCursor)
+        btn_reset.clicked.connect(self.reset)
+        btn_layout.addWidget(btn_reset)
+        layout.addLayout(btn_layout)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        metrics.enable()
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def reset(self):
+        metrics.registry.reset()
+        self.refresh()
+
+    def refresh(self):
+        snapshot = metrics.registry.snapshot()
+        rows = [(name, str(stats["count"]), *(f"{stats[key] * 1000:.3f}" for key in ("p50", "p95", "p99")))
+                for name, stats in sorted(snapshot["timers"].items())]
+        rows += [(name, str(value), "", "", "") for name, value in sorted(snapshot["counters"].items())]
+
+        self.table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, text in enumerate(row):
+                item = self.table.item(r, c)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if c:
+                        item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                    self.table.setItem(r, c, item)
+                item.setText(text)
+        self.lbl_status.setText(f"{len(snapshot['timers'])} spans, {len(snapshot['counters'])} counters"
+                                f" - last {metrics.RESERVOIR_SIZE} samples per span")
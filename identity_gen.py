@@ -0,0 +1,223 @@
+import argparse
+import csv
+import multiprocessing
+import os
+import random
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+FIELDNAMES = ['Name', 'Email', 'Job', 'Address']
+
+# identities per work unit; each chunk gets its own seed
+CHUNK_SIZE = 1000
+
+# below this many identities a process pool costs more than it saves
+MIN_PARALLEL_COUNT = CHUNK_SIZE * 4
+
+# locale mixes are written "en_PH:5,en_US:3,ja_JP:2"; the weights are relative.
+# SIA_LOCALES replaces the default mix offered in the Identity Generator tab.
+LOCALES_ENV = "SIA_LOCALES"
+DEFAULT_LOCALE_MIX = "en_PH:5,en_US:3,ja_JP:2"
+
+# one Faker per locale per process: built on first use (or by the pool
+# initializer), since importing faker and loading its providers is the
+# slowest part of startup, and kept for the life of the process
+_fakers = {}
+_fake_lock = threading.Lock()
+
+
+def _build_faker(locale):
+    from faker import Faker
+    return Faker(locale) if locale else Faker()
+
+
+def get_faker(locale=None):
+    """Returns this process's shared Faker for `locale` (None: faker's default), building it on first call."""
+    with _fake_lock:
+        fake = _fakers.get(locale)
+        if fake is None:
+            fake = _fakers[locale] = _build_faker(locale)
+        return fake
+
+
+def warm_fakers(mix):
+    """Builds the shared Fakers for every locale in a mix ahead of use."""
+    for locale, _ in mix:
+        get_faker(locale)
+
+
+def parse_locales(spec):
+    """'en_PH:5,en_US:3' -> (('en_PH', 5.0), ('en_US', 3.0)). A locale without a weight counts 1.
+
+    Raises ValueError for a bad weight or a locale faker does not have.
+    """
+    mix = []
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        locale, _, weight = part.partition(":")
+        try:
+            weight = float(weight) if weight.strip() else 1.0
+        except ValueError:
+            raise ValueError(f"Bad weight in locale mix: {part.strip()!r}") from None
+        if weight <= 0:
+            raise ValueError(f"Locale weights must be positive: {part.strip()!r}")
+        mix.append((locale.strip(), weight))
+    if mix:
+        from faker.config import AVAILABLE_LOCALES
+        unknown = [locale for locale, _ in mix if locale not in AVAILABLE_LOCALES]
+        if unknown:
+            raise ValueError(f"Unknown locale: {', '.join(unknown)}")
+    return tuple(mix)
+
+
+def format_locales(mix):
+    total = sum(weight for _, weight in mix)
+    return ", ".join(f"{locale} {weight / total:.0%}" for locale, weight in mix)
+
+
+def configured_locales():
+    return parse_locales(os.environ.get(LOCALES_ENV) or DEFAULT_LOCALE_MIX)
+
+
+def pick_locale(mix, rng=random):
+    """One locale from a parse_locales() mix, chosen by weight."""
+    if len(mix) == 1:
+        return mix[0][0]
+    return rng.choices([locale for locale, _ in mix], weights=[weight for _, weight in mix])[0]
+
+
+# batch chunks get their own per-thread instances, reseeded for every chunk
+_chunk_local = threading.local()
+
+
+def _chunk_faker(locale=None):
+    fakers = getattr(_chunk_local, 'fakers', None)
+    if fakers is None:
+        fakers = _chunk_local.fakers = {}
+    fake = fakers.get(locale)
+    if fake is None:
+        fake = fakers[locale] = _build_faker(locale)
+    return fake
+
+
+def make_identity(fake):
+    """Builds one identity row from a Faker instance."""
+    return {
+        "Name": fake.name(),
+        "Email": fake.email(),
+        "Job": fake.job(),
+        "Address": fake.address().replace("\n", ", "),
+    }
+
+
+def chunk_seed(seed, index):
+    # derived from the chunk, not the worker, so output ignores worker count
+    return seed * 1_000_003 + index
+
+
+def _init_worker(mix=()):
+    for locale, _ in mix or ((None, 1),):
+        _chunk_faker(locale)
+
+
+def _generate_chunk(seed, index, size, mix=()):
+    seed = chunk_seed(seed, index)
+    if not mix:
+        fake = _chunk_faker()
+        fake.seed_instance(seed)
+        return [make_identity(fake) for _ in range(size)]
+
+    # the locale of each row and each locale's Faker are all seeded from the chunk
+    rng = random.Random(seed)
+    fakers = {}
+    for locale, _ in mix:
+        fakers[locale] = _chunk_faker(locale)
+        fakers[locale].seed_instance(f"{seed}:{locale}")
+    return [make_identity(fakers[pick_locale(mix, rng)]) for _ in range(size)]
+
+
+def _chunk_sizes(count, chunk_size):
+    for index, start in enumerate(range(0, count, chunk_size)):
+        yield index, min(chunk_size, count - start)
+
+
+def generate_identities(count, seed=None, workers=None, chunk_size=CHUNK_SIZE, locales=()):
+    """Yields `count` identities as lists of up to `chunk_size` rows, in order.
+
+    Chunks are generated across a process pool with at most two chunks per
+    worker in flight, so memory stays flat however large `count` is. The
+    same seed always gives the same rows for any number of workers.
+    With `locales` (a parse_locales() mix) each row's locale is drawn by weight.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or count < MIN_PARALLEL_COUNT:
+        for index, size in _chunk_sizes(count, chunk_size):
+            yield _generate_chunk(seed, index, size, locales)
+        return
+
+    # spawn: forking a process that already runs Qt threads is unsafe
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(locales,)) as pool:
+        pending = deque()
+        for index, size in _chunk_sizes(count, chunk_size):
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+            pending.append(pool.submit(_generate_chunk, seed, index, size, locales))
+        while pending:
+            yield pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate fake identities headlessly")
+    parser.add_argument('--count', type=int, required=True)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None, help="default: all cores")
+    parser.add_argument('--out', default='-', help="CSV file to write, '-' for stdout")
+    parser.add_argument('--append', action='store_true', help="add to --out instead of replacing it")
+    parser.add_argument('--locales', default='',
+                        help=f"weighted locale mix, e.g. {DEFAULT_LOCALE_MIX} (default: faker's locale)")
+    parser.add_argument('--unique', default='',
+                        help="comma-separated columns (Name, Email) that must not repeat within --out")
+    args = parser.parse_args(argv)
+
+    columns = tuple(c.strip() for c in args.unique.split(',') if c.strip())
+    try:
+        locales = parse_locales(args.locales)
+    except ValueError as e:
+        parser.error(str(e))
+    if columns and args.out == '-':
+        parser.error("--unique needs an --out file")
+
+    f = sys.stdout if args.out == '-' else open(args.out, 'a' if args.append else 'w', newline='', encoding='utf-8')
+    index = None
+    try:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        if f is sys.stdout or f.tell() == 0:
+            writer.writeheader()
+        if columns:
+            from uniqueness import UniqueIndex, generate_unique
+            f.flush()
+            index = UniqueIndex(args.out)
+            chunks = generate_unique(args.count, index, columns, args.seed, args.workers, locales=locales)
+        else:
+            chunks = generate_identities(args.count, args.seed, args.workers, locales=locales)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            if index:
+                index.commit(chunk)
+    finally:
+        if f is not sys.stdout:
+            f.close()
+        if index:
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+import argparse
+import csv
+import json
+import os
+import queue
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter
+from itertools import islice
+
+import metrics
+from identity_gen import FIELDNAMES
+
+IDENTITY_DB = 'identities.db'
+
+# rows per transaction when bulk inserting
+INSERT_BATCH = 50_000
+
+# chunks of rows that may wait in the queue before StoreWriter.write_rows() blocks
+QUEUE_SIZE = 64
+
+# how often flush() checks that the writer thread is still there
+FLUSH_POLL = 0.1
+
+COLUMNS = ('name', 'email', 'job', 'address')  # table columns, in FIELDNAMES order
+
+# secondary indexes; dropped while an empty store is bulk loaded, then rebuilt
+INDEXES = (
+    ("idx_identities_email", "CREATE INDEX IF NOT EXISTS idx_identities_email ON identities (email)"),
+    ("idx_identities_name", "CREATE INDEX IF NOT EXISTS idx_identities_name ON identities (name)"),
+)
+
+SQL_INSERT = "INSERT INTO identities (name, email, job, address) VALUES (?, ?, ?, ?)"
+# missing values reach the CSV as '', so NULL job/address match '' there
+SQL_EXISTS = ("SELECT 1 FROM identities WHERE email IS ? AND name IS ? AND coalesce(job, '') = coalesce(?, '') "
+              "AND coalesce(address, '') = coalesce(?, '') AND id <= ? LIMIT 1")
+SQL_COUNT_JOB = ("INSERT INTO job_counts (job, n) VALUES (?, ?) "
+                 "ON CONFLICT(job) DO UPDATE SET n=n+excluded.n")
+
+# most rows returned by one lookup
+SEARCH_LIMIT = 1000
+
+# columnar export: rows per chunk and zlib level
+COLUMNAR_CHUNK_ROWS = 65_536
+COLUMNAR_LEVEL = 6
+COLUMNAR_MAGIC = b"SIACOL1\0"
+COLUMNAR_HEADER = struct.Struct("<8sI")  # magic, length of the JSON column list
+CHUNK_HEADER = struct.Struct("<I")       # rows in the chunk; then one <Q size per column
+
+_STOP = object()
+
+
+class IdentityStore:
+    """Generated identities in an indexed SQLite table, next to the CSV.
+
+    Email and Name are indexed case-insensitively, so exact lookups and
+    name prefixes are B-tree seeks. Rows per job title are kept in a small
+    job_counts table that is updated in the same transaction as the
+    insert, so that aggregate and the total row count never scan the table.
+    """
+
+    def __init__(self, path=IDENTITY_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.execute("PRAGMA cache_size=-64000")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS identities (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT COLLATE NOCASE,
+                    email TEXT COLLATE NOCASE,
+                    job TEXT,
+                    address TEXT
+                )
+            """)
+            for _, sql in INDEXES:
+                self.conn.execute(sql)
+            self.conn.execute("CREATE TABLE IF NOT EXISTS job_counts (job TEXT PRIMARY KEY, n INTEGER) WITHOUT ROWID")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+
+    def count(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key='rows'").fetchone()
+        return row[0] if row else 0
+
+    def add_rows(self, rows, batch=INSERT_BATCH, skip_existing=False):
+        """Inserts dict rows (FIELDNAMES keys), `batch` rows per transaction. Returns the number added.
+
+        With skip_existing=True, rows identical to one already in the store
+        before the call are left out (one email index seek per row).
+        """
+        rows = iter(rows)
+        added = 0
+        last_id = self.conn.execute("SELECT max(id) FROM identities").fetchone()[0] if skip_existing else None
+        while True:
+            chunk = [(r.get('Name'), r.get('Email'), r.get('Job'), r.get('Address')) for r in islice(rows, batch)]
+            if not chunk:
+                return added
+            if last_id is not None:
+                chunk = [r for r in chunk
+                         if not self.conn.execute(SQL_EXISTS, (r[1], r[0], r[2], r[3], last_id)).fetchone()]
+                if not chunk:
+                    continue
+            with metrics.span("identity_store.insert"), self.conn:
+                self.conn.executemany(SQL_INSERT, chunk)
+                # job_counts.job is the key, so a row without a Job is counted under ''
+                self.conn.executemany(SQL_COUNT_JOB, Counter(r[2] or '' for r in chunk).items())
+                self.conn.execute("""
+                    INSERT INTO meta (key, value) VALUES ('rows', ?)
+                    ON CONFLICT(key) DO UPDATE SET value=value+excluded.value
+                """, (len(chunk),))
+            added += len(chunk)
+
+    def import_csv(self, csv_path, batch=INSERT_BATCH):
+        """Loads a generated_data.csv-style file. Returns the number of rows added.
+
+        Into an empty store the indexes are built once after the load, which
+        is several times faster than maintaining them row by row. Into a
+        non-empty one, rows the store already has are skipped, so importing
+        a CSV that StoreWriter has been mirroring (or importing the same
+        file twice) only adds what is missing.
+        """
+        bulk = self.count() == 0
+        if bulk:
+            with self.conn:
+                for name, _ in INDEXES:
+                    self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+        try:
+            with open(csv_path, newline='', encoding='utf-8') as f:
+                return self.add_rows(csv.DictReader(f), batch, skip_existing=not bulk)
+        finally:
+            if bulk:
+                with self.conn:
+                    for _, sql in INDEXES:
+                        self.conn.execute(sql)
+                self.conn.execute("ANALYZE")
+
+    def _rows(self, where, params, limit, order="id"):
+        cursor = self.conn.execute(
+            f"SELECT name, email, job, address FROM identities WHERE {where} ORDER BY {order} LIMIT ?",
+            (*params, limit))
+        return [dict(zip(FIELDNAMES, row)) for row in cursor]
+
+    def find_email(self, email, limit=SEARCH_LIMIT):
+        """Rows with this email, ignoring case."""
+        return self._rows("email = ?", (email.strip(),), limit)
+
+    def find_name(self, name, prefix=False, limit=SEARCH_LIMIT):
+        """Rows with this name (ignoring case), or starting with it when prefix=True."""
+        name = name.strip()
+        if prefix:
+            # in index order, so LIMIT stops the scan early
+            return self._rows("name >= ? AND name < ?", (name, name + "\U0010ffff"), limit, "name, id")
+        return self._rows("name = ?", (name,), limit)
+
+    def count_by_job(self, limit=None):
+        """[(job, rows)], most common first."""
+        return self.conn.execute("SELECT job, n FROM job_counts ORDER BY n DESC, job LIMIT ?",
+                                 (-1 if limit is None else limit,)).fetchall()
+
+    def iter_chunks(self, size=COLUMNAR_CHUNK_ROWS):
+        """Yields every row as tuples in COLUMNS order, `size` at a time, oldest first."""
+        cursor = self.conn.execute("SELECT name, email, job, address FROM identities ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                return
+            yield rows
+
+    def export(self, path, chunk_rows=COLUMNAR_CHUNK_ROWS):
+        """Writes the whole table in a compressed columnar file. Returns the number of rows.
+
+        A `.parquet` path needs pyarrow; anything else gets the built-in
+        chunked format read by read_columnar().
+        """
+        if path.endswith(".parquet"):
+            return _export_parquet(self.iter_chunks(chunk_rows), path)
+        return write_columnar(self.iter_chunks(chunk_rows), path)
+
+    def close(self):
+        self.conn.close()
+
+
+class StoreWriter:
+    """Adds dict rows to an IdentityStore from a background thread.
+
+    Same interface as CsvWriter, so the two can be fed the same chunks.
+    Everything queued when the thread wakes up goes into one transaction
+    (up to INSERT_BATCH rows); write_rows() blocks while the queue is full.
+    """
+
+    def __init__(self, path=IDENTITY_DB, queue_size=QUEUE_SIZE, max_batch=INSERT_BATCH, on_error=None):
+        self.path = path
+        self.max_batch = max_batch
+        self.on_error = on_error
+        self.rows_written = 0
+        self.error = None
+        self.closed = False
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="identity-store-writer", daemon=True)
+        self._thread.start()
+
+    def write_rows(self, rows, timeout=None):
+        """Queues a chunk of rows, blocking while the queue is full."""
+        if self.error:
+            raise OSError(self.error)
+        if self.closed:
+            raise OSError("identity store writer is closed")
+        self._queue.put(list(rows), timeout=timeout)
+
+    def flush(self, timeout=None):
+        """Blocks until everything queued so far is committed.
+
+        Returns False on timeout and raises OSError once the writer has
+        failed. After close() everything is already committed.
+        """
+        if self.error:
+            raise OSError(self.error)
+        if self.closed or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done, timeout=timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # a thread that dies before reaching the marker never sets it
+        while not done.wait(FLUSH_POLL):
+            if not self._thread.is_alive() or (deadline is not None and time.monotonic() >= deadline):
+                break
+        if self.error:
+            raise OSError(self.error)
+        return done.is_set()
+
+    def close(self):
+        """Commits everything still queued and closes the store."""
+        self.closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _run(self):
+        store = None
+        stopping = False
+        waiters = []
+        try:
+            store = IdentityStore(self.path)
+            while not stopping:
+                rows = []
+                waiters = []
+                item = self._queue.get()
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        rows.extend(item)
+                    if stopping or len(rows) >= self.max_batch:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if rows:
+                    store.add_rows(rows, self.max_batch)
+                    self.rows_written += len(rows)
+                for done in waiters:
+                    done.set()
+        except Exception as e:
+            self.error = str(e)
+            if self.on_error:
+                self.on_error(self.error)
+            for done in waiters:
+                done.set()
+            # keep draining so producers blocked on put() are released
+            while not stopping:
+                item = self._queue.get()
+                if isinstance(item, threading.Event):
+                    item.set()
+                stopping = item is _STOP
+        finally:
+            if store:
+                store.close()
+
+
+# chunked columnar format:
+#   header: magic, JSON column list
+#   chunk:  row count, then per column its compressed size, then each column's
+#           zlib block (uint32 byte lengths of the values followed by the UTF-8 values)
+# a reader can skip the columns it does not want without decompressing them
+def write_columnar(chunks, path, columns=COLUMNS, level=COLUMNAR_LEVEL):
+    """Writes chunks of row tuples to `path`. Returns the number of rows."""
+    total = 0
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        names = json.dumps(list(columns)).encode("utf-8")
+        f.write(COLUMNAR_HEADER.pack(COLUMNAR_MAGIC, len(names)))
+        f.write(names)
+        for rows in chunks:
+            blocks = []
+            for values in zip(*rows):
+                data = [(v or "").encode("utf-8") for v in values]
+                lengths = array("I", map(len, data))
+                blocks.append(zlib.compress(lengths.tobytes() + b"".join(data), level))
+            f.write(CHUNK_HEADER.pack(len(rows)))
+            f.write(struct.pack(f"<{len(blocks)}Q", *map(len, blocks)))
+            for block in blocks:
+                f.write(block)
+            total += len(rows)
+    os.replace(tmp, path)
+    return total
+
+
+def read_columnar(path, columns=None):
+    """Yields {column: [values]} per chunk of a write_columnar() file.
+
+    Only the requested columns (default: all) are decompressed.
+    """
+    with open(path, "rb") as f:
+        magic, size = COLUMNAR_HEADER.unpack(f.read(COLUMNAR_HEADER.size))
+        if magic != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a columnar identity export")
+        names = json.loads(f.read(size))
+        wanted = set(columns or names)
+        sizes = struct.Struct(f"<{len(names)}Q")
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if not header:
+                return
+            (rows,) = CHUNK_HEADER.unpack(header)
+            chunk = {}
+            for name, block_size in zip(names, sizes.unpack(f.read(sizes.size))):
+                if name not in wanted:
+                    f.seek(block_size, os.SEEK_CUR)
+                    continue
+                raw = zlib.decompress(f.read(block_size))
+                lengths = array("I")
+                lengths.frombytes(raw[:rows * lengths.itemsize])
+                values = []
+                pos = rows * lengths.itemsize
+                for n in lengths:
+                    values.append(raw[pos:pos + n].decode("utf-8"))
+                    pos += n
+                chunk[name] = values
+            yield chunk
+
+
+def _export_parquet(chunks, path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from None
+    schema = pa.schema([(name, pa.string()) for name in COLUMNS])
+    total = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_arrays([pa.array(v) for v in zip(*rows)], schema=schema))
+            total += len(rows)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query or load the identity store")
+    parser.add_argument('--db', default=IDENTITY_DB)
+    commands = parser.add_subparsers(dest='command', required=True)
+    load = commands.add_parser('import', help="add the rows of a CSV file")
+    load.add_argument('csv', nargs='?', default='generated_data.csv')
+    find = commands.add_parser('find', help="look up identities by email or name")
+    find.add_argument('--email')
+    find.add_argument('--name')
+    find.add_argument('--prefix', action='store_true', help="match names starting with --name")
+    jobs = commands.add_parser('jobs', help="identities per job title")
+    jobs.add_argument('--limit', type=int, default=20)
+    dump = commands.add_parser('export', help="write a compressed columnar copy (.parquet needs pyarrow)")
+    dump.add_argument('out')
+    args = parser.parse_args(argv)
+
+    store = IdentityStore(args.db)
+    try:
+        if args.command == 'import':
+            print(f"imported {store.import_csv(args.csv):,} rows into {args.db}")
+        elif args.command == 'find':
+            if args.email:
+                rows = store.find_email(args.email)
+            elif args.name:
+                rows = store.find_name(args.name, prefix=args.prefix)
+            else:
+                parser.error("find needs --email or --name")
+            writer = csv.DictWriter(sys.stdout, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+        elif args.command == 'jobs':
+            for job, n in store.count_by_job(args.limit):
+                print(f"{n:>10,}  {job}")
+            print(f"{store.count():>10,}  total")
+        elif args.command == 'export':
+            print(f"exported {store.export(args.out):,} rows to {args.out}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,78 +1,50 @@
+import time
+STARTUP_T0 = time.perf_counter()
+
 import sys
 import os
+from functools import partial
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QLabel, QLineEdit, QPushButton, QMessageBox, QStackedWidget, QFrame, QCheckBox)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont, QIcon, QFontDatabase, QColor
+from PyQt6.QtCore import Qt, QObject, QEvent, QTimer
+from PyQt6.QtGui import QFont, QIcon, QFontDatabase, QColor, QKeySequence, QShortcut
 from PyQt6.QtWidgets import QGraphicsDropShadowEffect
 import database 
-from utilities import UtilityScreen
-
-# styling (dark theme)
-STYLESHEET = """
-    /* Main Background - Dark Gradient */
-    QMainWindow {
-        background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                                    stop:0 #2b5876, stop:1 #4e4376);
-    }
-    QWidget {
-        font-family: 'Segoe UI', sans-serif;
-        font-size: 14px;
-        color: #ecf0f1;
-    }
-
-    /* The Cards (Dark Glass Effect) */
-    QFrame#LoginCard {
-        background-color: #1e272e;
-        border-radius: 20px;
-        border: 1px solid #353b48;
-    }
-
-    /* Input Fields */
-    QLineEdit {
-        background-color: #2f3640;
-        border: 2px solid #353b48;
-        border-radius: 10px;
-        padding: 12px;
-        color: #f5f6fa;
-        selection-background-color: #00a8ff;
-    }
-    QLineEdit:focus {
-        border: 2px solid #00a8ff; 
-        background-color: #353b48;
-    }
-
-    /* Headings */
-    QLabel#Header {
-        font-size: 28px;
-        font-weight: 800;
-        color: #f5f6fa;
-        margin-bottom: -10px;
-    }
-    QLabel#SubHeader {
-        font-size: 15px;
-        color: #dcdde1;
-        font-weight: 500;
-    }
-
-    /* Buttons */
-    QPushButton {
-        border-radius: 10px;
-        padding: 12px;
-        font-weight: bold;
-        font-size: 15px;
-        border: none;
-        outline: 0; 
-    }
-    QPushButton:focus {
-        outline: none;
-    }
-    
-    /* Checkbox Styling */
-    QCheckBox { color: #dcdde1; font-size: 13px; font-weight: 600; spacing: 8px;}
-    QCheckBox::indicator { width: 18px; height: 18px; border: 2px solid #7f8fa6; border-radius: 4px; background: #2f3640;}
-    QCheckBox::indicator:checked { background-color: #00a8ff; border: 2px solid #00a8ff; }
-"""
+import metrics
+import theme
+from workers import run_task
+# utilities (and faker/requests behind it) is imported after the first paint, see warm_up()
+
+IMPORTS_DONE = time.perf_counter()
+
+# python main.py --startup-profile: print startup timings and exit
+PROFILE_STARTUP = "--startup-profile" in sys.argv
+
+def warm_up():
+    """Loads the dashboard's heavy modules off the GUI thread. Returns timings in seconds."""
+    timings = {}
+    start = time.perf_counter()
+    import utilities
+    timings["import utilities"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    utilities.get_faker()
+    timings["Faker()"] = time.perf_counter() - start
+    return timings
+
+class FirstPaintWatcher(QObject):
+    """Calls back once, just after the watched widget first paints."""
+
+    def __init__(self, widget, callback):
+        super().__init__(widget)
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            QTimer.singleShot(0, self.callback)
+        return False
 
 class MainApp(QMainWindow):
     def __init__(self):
@@ -84,10 +56,13 @@ class MainApp(QMainWindow):
         if os.path.exists(self.icon_path):
             self.setWindowIcon(QIcon(self.icon_path)) 
 
-        self.setStyleSheet(STYLESHEET)
+        theme.apply(QApplication.instance())
         database.initialize_db()
         self.current_user = "" 
 
+        # auth requests running on the thread pool, keyed to drop repeat clicks
+        self.auth_inflight = {}
+
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
         
@@ -101,6 +76,40 @@ class MainApp(QMainWindow):
         self.stack.setCurrentIndex(0)
         self.center_window()
 
+        self.window_built = time.perf_counter()
+        # one dashboard for the life of the app, reset between users
+        self.utility_screen = None
+        # user administration, built the first time an admin opens it
+        self.admin_screen = None
+        self.warm_up_task = None
+        self.first_paint = FirstPaintWatcher(self, self.on_first_paint)
+
+        # hidden diagnostics panel
+        self.diagnostics = None
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, self.show_diagnostics)
+
+    def on_first_paint(self):
+        if PROFILE_STARTUP:
+            print(f"imports:      {(IMPORTS_DONE - STARTUP_T0) * 1000:8.1f} ms")
+            print(f"window built: {(self.window_built - STARTUP_T0) * 1000:8.1f} ms")
+            print(f"first paint:  {(time.perf_counter() - STARTUP_T0) * 1000:8.1f} ms")
+        self.warm_up_task = run_task(warm_up, on_done=self.on_warm_up_done)
+
+    def on_warm_up_done(self, timings):
+        self.warm_up_task = None
+        self.get_utility_screen()
+        if PROFILE_STARTUP:
+            for name, seconds in timings.items():
+                print(f"warm-up {name}: {seconds * 1000:8.1f} ms (background)")
+            QApplication.quit()
+
+    def show_diagnostics(self):
+        if self.diagnostics is None:
+            from diagnostics import DiagnosticsPanel
+            self.diagnostics = DiagnosticsPanel(self)
+        self.diagnostics.show()
+        self.diagnostics.raise_()
+
     def center_window(self):
         qr = self.frameGeometry()
         cp = self.screen().availableGeometry().center()
@@ -162,11 +171,8 @@ class MainApp(QMainWindow):
 
         card_layout.addSpacing(20)
 
-        btn_login = QPushButton("Login to Dashboard")
-        btn_login.setStyleSheet("""
-            QPushButton { background-color: #00a8ff; color: white; }
-            QPushButton:hover { background-color: #0097e6; margin-top: 2px; }
-        """)
+        self.btn_login = btn_login = QPushButton("Login to Dashboard")
+        btn_login.setProperty("variant", "primary")
         btn_login.setCursor(Qt.CursorShape.PointingHandCursor)
         btn_login.clicked.connect(self.process_login)
         card_layout.addWidget(btn_login)
@@ -174,10 +180,7 @@ class MainApp(QMainWindow):
         card_layout.addSpacing(15)
 
         btn_register = QPushButton("Create New Account")
-        btn_register.setStyleSheet("""
-            QPushButton { background-color: transparent; color: #dcdde1; border: 2px solid #718093; }
-            QPushButton:hover { background-color: #718093; color: white; }
-        """)
+        btn_register.setProperty("variant", "outline")
         btn_register.setCursor(Qt.CursorShape.PointingHandCursor)
         btn_register.clicked.connect(lambda: self.stack.setCurrentIndex(1)) 
         card_layout.addWidget(btn_register)
@@ -229,11 +232,8 @@ class MainApp(QMainWindow):
 
         card_layout.addSpacing(20)
 
-        btn_submit = QPushButton("Sign Up")
-        btn_submit.setStyleSheet("""
-            QPushButton { background-color: #4cd137; color: white; }
-            QPushButton:hover { background-color: #44bd32; margin-top: 2px; }
-        """)
+        self.btn_submit = btn_submit = QPushButton("Sign Up")
+        btn_submit.setProperty("variant", "success")
         btn_submit.setCursor(Qt.CursorShape.PointingHandCursor)
         btn_submit.clicked.connect(self.process_register)
         card_layout.addWidget(btn_submit)
@@ -241,10 +241,7 @@ class MainApp(QMainWindow):
         card_layout.addSpacing(15)
 
         btn_back = QPushButton("Back to Login")
-        btn_back.setStyleSheet("""
-            QPushButton { background-color: transparent; color: #7f8fa6; }
-            QPushButton:hover { color: #f5f6fa; }
-        """)
+        btn_back.setProperty("variant", "link")
         btn_back.setCursor(Qt.CursorShape.PointingHandCursor)
         btn_back.clicked.connect(lambda: self.stack.setCurrentIndex(0))
         card_layout.addWidget(btn_back)
@@ -260,27 +257,83 @@ class MainApp(QMainWindow):
         else:
             line_edit.setEchoMode(QLineEdit.EchoMode.Password)
 
+    # busy state while a request is on the worker pool
+    def set_busy(self, button, busy, text):
+        button.setEnabled(not busy)
+        button.setText(text)
+
+    def auth_busy(self, kind):
+        # Enter still works while the button is disabled, so check for any request of this kind
+        return any(key[0] == kind for key in self.auth_inflight)
+
+    @staticmethod
+    def login_job(user, pw):
+        return user, database.check_credentials(user, pw)
+
+    @staticmethod
+    def register_job(user, pw):
+        return user, database.add_new_user(user, pw)
+
     def process_login(self):
         user = self.input_user.text()
         pw = self.input_pass.text()
 
-        if database.check_credentials(user, pw):
+        key = ("login", user)
+        if self.auth_busy("login"):
+            return
+        self.set_busy(self.btn_login, True, "Signing in...")
+        self.auth_inflight[key] = run_task(self.login_job, user, pw,
+                                           on_done=self.on_login_done,
+                                           on_error=partial(self.on_login_error, key))
+
+    def on_login_error(self, key, error):
+        self.auth_inflight.pop(key, None)
+        self.set_busy(self.btn_login, False, "Login to Dashboard")
+        QMessageBox.critical(self, "Error", f"Could not check credentials: {error}")
+
+    def on_login_done(self, result):
+        user, ok = result
+        self.auth_inflight.pop(("login", user), None)
+        self.set_busy(self.btn_login, False, "Login to Dashboard")
+
+        if ok:
             self.current_user = user
             self.input_user.clear()
             self.input_pass.clear()
             self.check_show_pass_login.setChecked(False)
             
-            self.utility_screen = UtilityScreen(self.handle_logout, self.current_user)
-            self.stack.addWidget(self.utility_screen) 
-            self.stack.setCurrentWidget(self.utility_screen)
+            screen = self.get_utility_screen()
+            screen.start_session(self.current_user)
+            self.stack.setCurrentWidget(screen)
         else:
             QMessageBox.warning(self, "Login Failed", "Invalid Username or Password")
 
+    def get_utility_screen(self):
+        if self.utility_screen is None:
+            from utilities import UtilityScreen
+            self.utility_screen = UtilityScreen(self.handle_logout, self.current_user, self.show_admin)
+            self.stack.addWidget(self.utility_screen)
+        return self.utility_screen
+
+    def show_admin(self):
+        if self.current_user not in database.admin_users():
+            return
+        if self.admin_screen is None:
+            from admin import AdminScreen
+            self.admin_screen = AdminScreen(self.close_admin)
+            self.stack.addWidget(self.admin_screen)
+        self.admin_screen.start_session(self.current_user)
+        self.stack.setCurrentWidget(self.admin_screen)
+
+    def close_admin(self):
+        self.admin_screen.shutdown()
+        self.stack.setCurrentWidget(self.utility_screen)
+
     def handle_logout(self):
         self.current_user = ""
-        self.stack.removeWidget(self.utility_screen)
-        self.utility_screen.deleteLater()
-        self.utility_screen = None
+        self.utility_screen.shutdown()
+        if self.admin_screen:
+            self.admin_screen.shutdown()
         self.stack.setCurrentIndex(0)
 
     def process_register(self):
@@ -295,7 +348,25 @@ class MainApp(QMainWindow):
             QMessageBox.warning(self, "Weak Password", "Password must be at least 8 characters long.")
             return
 
-        if database.add_new_user(user, pw):
+        key = ("register", user)
+        if self.auth_busy("register"):
+            return
+        self.set_busy(self.btn_submit, True, "Creating account...")
+        self.auth_inflight[key] = run_task(self.register_job, user, pw,
+                                           on_done=self.on_register_done,
+                                           on_error=partial(self.on_register_error, key))
+
+    def on_register_error(self, key, error):
+        self.auth_inflight.pop(key, None)
+        self.set_busy(self.btn_submit, False, "Sign Up")
+        QMessageBox.critical(self, "Error", f"Could not create account: {error}")
+
+    def on_register_done(self, result):
+        user, ok = result
+        self.auth_inflight.pop(("register", user), None)
+        self.set_busy(self.btn_submit, False, "Sign Up")
+
+        if ok:
             QMessageBox.information(self, "Success", "Account Created! You can now login.")
             self.stack.setCurrentIndex(0)
             self.reg_user.clear()
@@ -306,6 +377,10 @@ class MainApp(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(database.close_connections)
+    # SIA_METRICS=metrics.prom (or .jsonl) exports timings while the app runs
+    metrics.configure_from_env()
+    app.aboutToQuit.connect(metrics.disable)
     window = MainApp()
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,225 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+# SIA_METRICS=metrics.prom (Prometheus text) or metrics.jsonl (JSON lines)
+# turns collection on at startup and exports to that file
+METRICS_ENV = "SIA_METRICS"
+EXPORT_INTERVAL = 10.0
+
+# recent samples kept per timer for the percentiles
+RESERVOIR_SIZE = 2048
+QUANTILES = (0.5, 0.95, 0.99)
+
+PROMETHEUS_PREFIX = "sia_"
+
+
+def summarize(count, total, recent):
+    """count/sum plus p50/p95/p99 over the recent samples."""
+    ordered = sorted(recent)
+    stats = {"count": count, "sum": total}
+    for q in QUANTILES:
+        stats[f"p{round(q * 100)}"] = ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+    return stats
+
+
+class Timer:
+    """Latency samples for one span name: totals plus a window of recent values."""
+
+    def __init__(self, size=RESERVOIR_SIZE):
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=size)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+
+class Registry:
+    """Process-wide timers and counters. Does nothing while disabled."""
+
+    def __init__(self):
+        self.enabled = False
+        self.timers = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = Timer()
+            timer.observe(seconds)
+
+    def inc(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        """Returns {"timers": {name: stats}, "counters": {name: value}}."""
+        with self._lock:
+            timers = {name: (t.count, t.total, list(t.recent)) for name, t in self.timers.items()}
+            counters = dict(self.counters)
+        # sort outside the lock so recording threads are not held up
+        stats = {name: summarize(*values) for name, values in timers.items()}
+        return {"timers": stats, "counters": counters}
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+
+registry = Registry()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    """Times a with-block under `name`. A shared no-op when metrics are off."""
+    return _Span(name) if registry.enabled else _NO_SPAN
+
+
+def timed(name):
+    """Decorator form of span() for plain functions.
+
+    Not for Qt slots: PyQt passes extra signal arguments to *args wrappers.
+    """
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def inc(name, n=1):
+    if registry.enabled:
+        registry.inc(name, n)
+
+
+# export formats
+def _prometheus_name(name):
+    return PROMETHEUS_PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def to_prometheus(snapshot):
+    lines = []
+    for name, stats in sorted(snapshot["timers"].items()):
+        metric = _prometheus_name(name) + "_seconds"
+        lines.append(f"# TYPE {metric} summary")
+        for q in QUANTILES:
+            lines.append(f'{metric}{{quantile="{q}"}} {stats[f"p{round(q * 100)}"]:.9f}')
+        lines.append(f"{metric}_sum {stats['sum']:.9f}")
+        lines.append(f"{metric}_count {stats['count']}")
+    for name, value in sorted(snapshot["counters"].items()):
+        metric = _prometheus_name(name) + "_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def to_json_line(snapshot):
+    return json.dumps(dict(snapshot, ts=time.time()), separators=(",", ":")) + "\n"
+
+
+def export(path):
+    """Writes one snapshot: replaces a Prometheus file, appends to a .jsonl file."""
+    snapshot = registry.snapshot()
+    if path.endswith((".jsonl", ".json")):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(to_json_line(snapshot))
+    else:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(to_prometheus(snapshot))
+        os.replace(tmp, path)
+
+
+class Exporter:
+    """Background thread that exports every `interval` seconds, and once more on stop()."""
+
+    def __init__(self, path, interval=EXPORT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._export()
+        self._export()
+
+    def _export(self):
+        try:
+            export(self.path)
+        except OSError:
+            pass
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+_exporter = None
+
+
+def enable(path=None, interval=EXPORT_INTERVAL):
+    """Starts collecting; with `path`, also exports there periodically."""
+    global _exporter
+    registry.enabled = True
+    if path and _exporter is None:
+        _exporter = Exporter(path, interval)
+
+
+def disable():
+    global _exporter
+    registry.enabled = False
+    if _exporter is not None:
+        _exporter.stop()
+        _exporter = None
+
+
+def configure_from_env():
+    path = os.environ.get(METRICS_ENV)
+    if path:
+        enable(path)
@@ -0,0 +1,212 @@
+from array import array
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QModelIndex
+
+# default number of identities kept in the on-screen history (None = unlimited)
+HISTORY_MAX_ROWS = 100_000
+
+# saved data view: rows read from the CSV at a time, and pages kept in memory
+PAGE_SIZE = 256
+MAX_PAGES = 64
+
+
+class IdentityListModel(QAbstractListModel):
+    """Newest-first list of generated identities for a QListView.
+
+    Rows are appended to a flat list and read back in reverse, so adding a
+    batch is O(batch) and the view only formats the rows it paints. When
+    max_rows is set the oldest rows are dropped from the bottom.
+    """
+
+    def __init__(self, max_rows=HISTORY_MAX_ROWS, parent=None):
+        super().__init__(parent)
+        self.max_rows = max_rows
+        self._rows = []
+        self._start = 0  # rows before this index have been dropped
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows) - self._start
+
+    def identity(self, row):
+        return self._rows[len(self._rows) - 1 - row]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            p = self.identity(index.row())
+            return f"Name: {p['Name']}\nEmail: {p['Email']}\nJob: {p['Job']}\nAddress: {p['Address']}"
+        return None
+
+    def add_identities(self, identities):
+        if not identities:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(identities) - 1)
+        self._rows.extend(identities)
+        self.endInsertRows()
+
+        if self.max_rows is not None:
+            excess = self.rowCount() - self.max_rows
+            if excess > 0:
+                self.beginRemoveRows(QModelIndex(), self.max_rows, self.max_rows + excess - 1)
+                self._start += excess
+                self.endRemoveRows()
+                # compact once the dead prefix is larger than the live rows
+                if self._start > len(self._rows) // 2:
+                    del self._rows[:self._start]
+                    self._start = 0
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self._start = 0
+        self.endResetModel()
+
+
+class SavedDataModel(QAbstractTableModel):
+    """Table over a CsvRowIndex that reads rows a page at a time as they are painted.
+
+    Only pages the view asks for are read (through the index's memory map)
+    and at most max_pages of them are cached. With a filter set, the model
+    shows just the matching row numbers, which arrive in batches from a
+    background scan.
+    """
+
+    def __init__(self, page_size=PAGE_SIZE, max_pages=MAX_PAGES, parent=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.index = None
+        self.columns = []
+        self._count = 0
+        self._matches = None  # row numbers passing the filter, or None for all rows
+        self._pages = OrderedDict()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._matches) if self._matches is not None else self._count
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.columns[section] if section < len(self.columns) else None
+        return str(self.source_row(section) + 1)
+
+    def source_row(self, row):
+        return self._matches[row] if self._matches is not None else row
+
+    def row(self, row):
+        """The fields of a visible row, reading its page on first use."""
+        source = self.source_row(row)
+        number, offset = divmod(source, self.page_size)
+        page = self._pages.get(number)
+        if page is None:
+            page = self._pages[number] = self.index.read_rows(number * self.page_size, self.page_size)
+            if len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(number)
+        return page[offset] if offset < len(page) else []
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        fields = self.row(index.row())
+        return fields[index.column()] if index.column() < len(fields) else None
+
+    def set_index(self, index):
+        self.beginResetModel()
+        self.index = index
+        self.columns = list(index.header)
+        self._count = len(index)
+        self._matches = None
+        self._pages.clear()
+        self.endResetModel()
+
+    def rows_appended(self):
+        """Shows rows the index picked up since the last call (not while filtered)."""
+        count = len(self.index)
+        if count <= self._count:
+            return
+        # the last page may have been read while it was still short
+        self._pages.pop(self._count // self.page_size, None)
+        if self._matches is None:
+            self.beginInsertRows(QModelIndex(), self._count, count - 1)
+            self._count = count
+            self.endInsertRows()
+        else:
+            self._count = count
+
+    def set_filtered(self, filtered):
+        """Switches between all rows and an (initially empty) list of matches."""
+        self.beginResetModel()
+        self._matches = array("Q") if filtered else None
+        self.endResetModel()
+
+    def add_matches(self, rows):
+        if not rows or self._matches is None:
+            return
+        start = len(self._matches)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._matches.extend(rows)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.index = None
+        self.columns = []
+        self._count = 0
+        self._matches = None
+        self._pages.clear()
+        self.endResetModel()
+
+
+class UserPageModel(QAbstractTableModel):
+    """One page of user accounts for the admin screen, as (username, disabled) rows."""
+
+    COLUMNS = ["Username", "Status"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        username, disabled = self._rows[index.row()]
+        if index.column() == 0:
+            return username
+        return "Disabled" if disabled else "Active"
+
+    def username(self, row):
+        return self._rows[row][0]
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
@@ -0,0 +1,398 @@
+import argparse
+import asyncio
+import csv
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+import database
+import metrics
+from identity_gen import FIELDNAMES, generate_identities, parse_locales
+from shortener import BACKENDS, DEFAULT_BACKEND, UrlCache, get_backend, shorten
+from sms_log import SMS_LOG_FILE, SmsLogWriter, tail as tail_sms_log
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8000
+
+# threads for blocking work: SQLite, hashing, shortener calls, SMS log puts
+EXECUTOR_WORKERS = 16
+
+MAX_BODY = 1 << 20
+MAX_HEADER = 1 << 16
+KEEPALIVE_TIMEOUT = 15
+
+# identity batches streaming at once; each large one runs its own process pool
+BATCH_STREAMS = 2
+MAX_IDENTITIES = 10_000_000
+
+# most SMS log entries returned by GET /sms/recent
+MAX_RECENT_SMS = 1000
+
+# same rule as the register screen
+MIN_PASSWORD_LENGTH = 8
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    def __init__(self, method, target, version, headers, body):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = parts.path
+        self.query = dict(parse_qsl(parts.query))
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self):
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HttpError(400, "Body must be JSON") from None
+        if not isinstance(data, dict):
+            raise HttpError(400, "Body must be a JSON object")
+        return data
+
+
+class Stream:
+    """Handler result sent with chunked transfer encoding, one chunk per item."""
+
+    def __init__(self, content_type, chunks):
+        self.content_type = content_type
+        self.chunks = chunks
+
+
+class BlockingIterator:
+    """Steps a blocking generator from executor threads, one call at a time.
+
+    If the request is cancelled while next() is still running on a worker,
+    close() waits for it instead of failing with "generator already executing".
+    """
+
+    def __init__(self, generator):
+        self.generator = generator
+        self._lock = threading.Lock()
+
+    def next(self):
+        with self._lock:
+            return next(self.generator, None)
+
+    def close(self):
+        with self._lock:
+            self.generator.close()
+
+
+class Service:
+    """HTTP/JSON front end over database, shortener, sms_log and identity_gen.
+
+    Every connection is a coroutine on one event loop; anything that blocks
+    (SQLite, hashing, HTTP calls to TinyURL, waiting on the SMS log) runs on a thread pool.
+    """
+
+    def __init__(self, workers=EXECUTOR_WORKERS, sms_log_path=SMS_LOG_FILE):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service")
+        self.sms_log_path = sms_log_path
+        self.sms_log = None
+        self.url_cache = None
+        self.batches = None
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/metrics"): self.export_metrics,
+            ("POST", "/login"): self.login,
+            ("POST", "/register"): self.register,
+            ("POST", "/shorten"): self.shorten,
+            ("POST", "/sms"): self.send_sms,
+            ("GET", "/sms/recent"): self.recent_sms,
+            ("GET", "/identities"): self.identities,
+        }
+
+    async def start(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        self.batches = asyncio.Semaphore(BATCH_STREAMS)
+        await self.run_blocking(database.initialize_db)
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_HEADER)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if self.sms_log:
+            self.sms_log.close()
+        database.close_connections()
+
+    def run_blocking(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    # endpoints
+    async def health(self, request):
+        return 200, {"ok": True}
+
+    async def export_metrics(self, request):
+        return 200, metrics.to_prometheus(metrics.registry.snapshot())
+
+    async def login(self, request):
+        username, password = self.credentials(request)
+        if await self.run_blocking(database.check_credentials, username, password):
+            return 200, {"ok": True, "username": username}
+        raise HttpError(401, "Invalid Username or Password")
+
+    async def register(self, request):
+        username, password = self.credentials(request)
+        if len(password) < MIN_PASSWORD_LENGTH:
+            raise HttpError(400, f"Password must be at least {MIN_PASSWORD_LENGTH} characters long.")
+        if await self.run_blocking(database.add_new_user, username, password):
+            return 201, {"ok": True, "username": username}
+        raise HttpError(409, "Username already exists.")
+
+    async def shorten(self, request):
+        data = request.json()
+        url = data.get("url")
+        if not url or not isinstance(url, str):
+            raise HttpError(400, "Please enter a URL")
+        name = data.get("backend", DEFAULT_BACKEND)
+        if name not in BACKENDS:
+            raise HttpError(400, f"Unknown backend {name!r}")
+        backend = await self.run_blocking(get_backend, name)
+        if self.url_cache is None:
+            self.url_cache = UrlCache()
+        try:
+            short_url, cached = await self.run_blocking(shorten, url, self.url_cache, backend)
+        except ValueError as e:
+            # a URL that cannot be parsed, e.g. a bad port
+            raise HttpError(400, f"Invalid URL: {e}") from None
+        except Exception as e:
+            raise HttpError(502, f"Connection Failed: {e}") from None
+        return 200, {"short_url": short_url, "cached": cached}
+
+    async def send_sms(self, request):
+        data = request.json()
+        number = str(data.get("number") or "")
+        message = str(data.get("message") or "")
+        if len(number) < 4 or not message:
+            raise HttpError(400, "Please check number and message")
+        if any(c in text for text in (number, message) for c in "\r\n"):
+            raise HttpError(400, "Number and message must be a single line")
+        # log() only formats and queues the line (the queue is unbounded), so it runs on the loop
+        self.get_sms_log().log(number, message)
+        return 202, {"ok": True}
+
+    def get_sms_log(self):
+        # a writer that failed is replaced, like the dashboard's
+        if self.sms_log is None or self.sms_log.error:
+            self.sms_log = SmsLogWriter(self.sms_log_path)
+        return self.sms_log
+
+    async def recent_sms(self, request):
+        try:
+            count = int(request.query.get("count", 20))
+        except ValueError:
+            raise HttpError(400, "count must be an integer") from None
+        if not 1 <= count <= MAX_RECENT_SMS:
+            raise HttpError(400, f"count must be between 1 and {MAX_RECENT_SMS}")
+        if self.sms_log:
+            await self.run_blocking(self.get_sms_log().flush)
+        entries = await self.run_blocking(tail_sms_log, self.sms_log_path, count)
+        return 200, {"entries": entries}
+
+    async def identities(self, request):
+        try:
+            count = int(request.query.get("count", 1))
+            seed = int(request.query["seed"]) if "seed" in request.query else None
+        except ValueError:
+            raise HttpError(400, "count and seed must be integers") from None
+        if not 1 <= count <= MAX_IDENTITIES:
+            raise HttpError(400, f"count must be between 1 and {MAX_IDENTITIES}")
+        fmt = request.query.get("format", "ndjson")
+        if fmt not in ("ndjson", "csv"):
+            raise HttpError(400, "format must be ndjson or csv")
+        try:
+            locales = parse_locales(request.query.get("locales", ""))
+        except ValueError as e:
+            raise HttpError(400, str(e)) from None
+        encode = self.encode_csv if fmt == "csv" else self.encode_ndjson
+        content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+        return 200, Stream(content_type, self.identity_chunks(count, seed, encode, locales))
+
+    async def identity_chunks(self, count, seed, encode, locales=()):
+        async with self.batches:
+            chunks = BlockingIterator(generate_identities(count, seed, locales=locales))
+            first = True
+            try:
+                while True:
+                    chunk = await self.run_blocking(chunks.next)
+                    if chunk is None:
+                        break
+                    yield encode(chunk, first)
+                    first = False
+            finally:
+                await asyncio.shield(self.run_blocking(chunks.close))
+
+    @staticmethod
+    def encode_ndjson(rows, first):
+        return "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+
+    @staticmethod
+    def encode_csv(rows, first):
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=FIELDNAMES)
+        if first:
+            writer.writeheader()
+        writer.writerows(rows)
+        return buf.getvalue().encode("utf-8")
+
+    @staticmethod
+    def credentials(request):
+        data = request.json()
+        username = data.get("username")
+        password = data.get("password")
+        if not isinstance(username, str) or not isinstance(password, str) or not username or not password:
+            raise HttpError(400, "Please fill all fields")
+        return username, password
+
+    # HTTP/1.1 plumbing
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader), KEEPALIVE_TIMEOUT)
+                except HttpError as e:
+                    await self.send(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                await self.dispatch(request, writer)
+                if not request.keep_alive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # server shutting down; end this connection quietly
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise HttpError(400, "Incomplete request") from None
+            return None
+        except asyncio.LimitOverrunError:
+            raise HttpError(431, "Request headers too large") from None
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line") from None
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HttpError(411, "Send a Content-Length")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HttpError(400, "Bad Content-Length") from None
+        if length > MAX_BODY:
+            raise HttpError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, version, headers, body)
+
+    async def dispatch(self, request, writer):
+        handler = self.routes.get((request.method, request.path))
+        if handler is None:
+            known = any(path == request.path for _, path in self.routes)
+            status, message = (405, "Method not allowed") if known else (404, "Not found")
+            await self.send(writer, status, {"error": message}, request.keep_alive)
+            return
+
+        with metrics.span("service." + handler.__name__):
+            try:
+                status, payload = await handler(request)
+            except HttpError as e:
+                status, payload = e.status, {"error": e.message}
+            except Exception as e:
+                status, payload = 500, {"error": str(e)}
+
+            if isinstance(payload, Stream):
+                await self.send_stream(writer, payload, request.keep_alive)
+            else:
+                await self.send(writer, status, payload, request.keep_alive)
+
+    @staticmethod
+    def head(status, content_type, keep_alive, extra):
+        reason = HTTPStatus(status).phrase
+        lines = [f"HTTP/1.1 {status} {reason}", f"Content-Type: {content_type}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}", *extra]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def send(self, writer, status, payload, keep_alive=True):
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        writer.write(self.head(status, content_type, keep_alive, [f"Content-Length: {len(body)}"]) + body)
+        await writer.drain()
+
+    async def send_stream(self, writer, stream, keep_alive=True):
+        writer.write(self.head(200, stream.content_type, keep_alive, ["Transfer-Encoding: chunked"]))
+        try:
+            async for data in stream.chunks:
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                # waits while the client is slow, so a batch never piles up in memory
+                await writer.drain()
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            await stream.chunks.aclose()
+
+
+async def serve(host=SERVICE_HOST, port=SERVICE_PORT, workers=EXECUTOR_WORKERS, sms_log_path=SMS_LOG_FILE):
+    service = Service(workers, sms_log_path)
+    server = await service.start(host, port)
+    print(f"Serving on http://{host}:{server.sockets[0].getsockname()[1]}/")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless HTTP service for the SIA utilities")
+    parser.add_argument('--host', default=SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    parser.add_argument('--workers', type=int, default=EXECUTOR_WORKERS, help="threads for blocking work")
+    parser.add_argument('--db', default=database.DB_NAME)
+    parser.add_argument('--sms-log', default=SMS_LOG_FILE)
+    args = parser.parse_args(argv)
+
+    database.DB_NAME = args.db
+    metrics.configure_from_env()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.sms_log))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        metrics.disable()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,21 @@
 import sqlite3
 import hashlib
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import database
+
+# rows per transaction during bulk import (hashed together, inserted one execute at a time)
+IMPORT_BATCH_SIZE = 50000
+
+# sqlite's default limit on bound parameters per statement
+MAX_SQL_PARAMS = 999
 
 def create_database():
     # Connect to the database (this creates the file if it doesn't exist)
@@ -35,5 +51,164 @@ def create_database():
     conn.close()
     print("Database setup complete. 'users.db' has been created.")
 
+# bulk import
+def read_users(path, fmt=None, on_invalid=None):
+    """Yields (line_number, username, password) from a CSV or JSONL file.
+
+    JSONL lines that are not a JSON object are skipped and passed to
+    `on_invalid(line_number, reason)` instead.
+    """
+    if fmt is None:
+        fmt = 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'jsonl':
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    if on_invalid:
+                        on_invalid(line_no, "invalid JSON")
+                    continue
+                if not isinstance(row, dict):
+                    if on_invalid:
+                        on_invalid(line_no, "expected a JSON object")
+                    continue
+                yield line_no, row.get('username'), row.get('password')
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row.get('username'), row.get('password')
+
+def _existing_usernames(conn, usernames):
+    found = set()
+    for i in range(0, len(usernames), MAX_SQL_PARAMS):
+        chunk = usernames[i:i + MAX_SQL_PARAMS]
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(f"SELECT username FROM users WHERE username IN ({placeholders})", chunk)
+        found.update(r[0] for r in rows)
+    return found
+
+def bulk_import(path, fmt=None, batch_size=IMPORT_BATCH_SIZE, workers=None, on_conflict=None):
+    """Streams users from a CSV/JSONL file into the users table.
+
+    Passwords are hashed across `workers` processes and each batch is
+    written in one transaction. Bad rows and duplicate usernames are passed
+    to `on_conflict(line_number, username, reason)` and skipped; the rest of
+    the batch is still inserted, including when another process registers
+    one of its usernames while the batch is being hashed. Returns
+    (inserted, conflicts).
+    """
+    database.initialize_db()
+    conn = database.get_connection()
+    workers = workers or os.cpu_count() or 1
+    inserted = 0
+    conflicts = 0
+
+    def report(line_no, username, reason):
+        nonlocal conflicts
+        conflicts += 1
+        if on_conflict:
+            on_conflict(line_no, username, reason)
+
+    # spawn: this may be called from a process that already runs Qt or service threads
+    pool = (ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            if workers > 1 else None)
+    try:
+        rows = read_users(path, fmt, on_invalid=lambda line_no, reason: report(line_no, None, reason))
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            seen = set()
+            valid = []
+            for line_no, username, password in batch:
+                if not username or not password:
+                    report(line_no, username, "missing username or password")
+                elif not isinstance(username, str) or not isinstance(password, str):
+                    report(line_no, username, "username and password must be strings")
+                elif username in seen:
+                    report(line_no, username, "duplicate username in file")
+                else:
+                    seen.add(username)
+                    valid.append((line_no, username, password))
+
+            existing = _existing_usernames(conn, [u for _, u, _ in valid])
+            to_insert = []
+            passwords = []
+            for line_no, username, password in valid:
+                if username in existing:
+                    report(line_no, username, "username already exists")
+                else:
+                    to_insert.append((line_no, username))
+                    passwords.append(password)
+
+            if pool:
+                chunksize = max(1, len(passwords) // (workers * 4))
+                hashes = pool.map(database.hash_password, passwords, chunksize=chunksize)
+            else:
+                hashes = map(database.hash_password, passwords)
+
+            # a name taken since the check above is skipped rather than failing the batch
+            added = []
+            with conn:
+                cursor = conn.cursor()
+                for (line_no, username), hashed in zip(to_insert, hashes):
+                    cursor.execute(database.SQL_INSERT_USER_OR_IGNORE, (username, hashed))
+                    if cursor.rowcount:
+                        added.append(username)
+                    else:
+                        report(line_no, username, "username already exists")
+            for username in added:
+                database.credential_cache.invalidate(username)
+            inserted += len(added)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    return inserted, conflicts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Set up and populate the users database")
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('init', help="create the users table and the default admin user")
+
+    p_import = sub.add_parser('import', help="bulk import users from a CSV or JSONL file")
+    p_import.add_argument('file', help="CSV with username,password columns or JSONL objects")
+    p_import.add_argument('--format', choices=['csv', 'jsonl'], help="defaults to the file extension")
+    p_import.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+    p_import.add_argument('--workers', type=int, default=None, help="hashing processes (default: all cores)")
+    p_import.add_argument('--db', default=database.DB_NAME)
+
+    p_reindex = sub.add_parser('reindex', help="rebuild the username search index (needed after VACUUM)")
+    p_reindex.add_argument('--db', default=database.DB_NAME)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'import':
+        database.DB_NAME = args.db
+
+        def print_conflict(line_no, username, reason):
+            print(f"line {line_no}: {username!r} skipped ({reason})", file=sys.stderr)
+
+        inserted, conflicts = bulk_import(args.file, args.format, args.batch_size,
+                                          args.workers, print_conflict)
+        database.close_connections()
+        print(f"Imported {inserted} users into '{args.db}', {conflicts} rows skipped.")
+    elif args.command == 'reindex':
+        database.DB_NAME = args.db
+        database.initialize_db()
+        rebuilt = database.rebuild_search_index()
+        database.close_connections()
+        if rebuilt:
+            print(f"Rebuilt the username search index in '{args.db}'.")
+        else:
+            print(f"'{args.db}' has no username search index yet; the admin screen builds it when it opens.")
+    else:
+        create_database()
+
 if __name__ == "__main__":
-    create_database()
\ No newline at end of file
+    main()
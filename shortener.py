@@ -0,0 +1,409 @@
+import argparse
+import random
+import sqlite3
+import string
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlsplit, urlunsplit
+
+import metrics
+
+# requests is imported where it is used, keeping it off the app's startup path
+
+URL_CACHE_DB = 'url_cache.db'
+
+# self-hosted backend: code -> URL store and the address its resolver serves on
+LINKS_DB = 'links.db'
+LOCAL_HOST = '127.0.0.1'
+LOCAL_PORT = 8080
+LOCAL_BASE_URL = f"http://localhost:{LOCAL_PORT}"
+
+DEFAULT_BACKEND = 'tinyurl'
+
+BASE62 = string.digits + string.ascii_letters
+
+# the endpoint pyshorteners' TinyURL shortener calls
+TINYURL_API = "http://tinyurl.com/api-create.php"
+REQUEST_TIMEOUT = 5
+
+# batch shortening: concurrent requests and per-URL retry policy
+BATCH_WORKERS = 8
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+
+# cache policy: entries expire after CACHE_TTL seconds, oldest go first past CACHE_MAX_ENTRIES
+CACHE_TTL = 30 * 24 * 3600
+CACHE_MAX_ENTRIES = 100_000
+
+# size eviction runs once every this many inserts
+EVICT_EVERY = 100
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    """Canonical form used as the cache key: trimmed, lowercase scheme/host, no default port."""
+    url = url.strip()
+    if "://" not in url:
+        url = "http://" + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{userinfo}@{host}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, parts.fragment))
+
+
+class UrlCache:
+    """Persistent long URL -> short URL cache in its own SQLite file.
+
+    Lookups are a primary-key read on a per-thread connection that stays
+    open, so a warm hit never leaves the process. Hit and miss counters
+    are kept for the current process.
+    """
+
+    def __init__(self, path=URL_CACHE_DB, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._inserts = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS short_urls (
+                    long_url TEXT PRIMARY KEY,
+                    short_url TEXT NOT NULL,
+                    created REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_short_urls_created ON short_urls (created)")
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def get(self, url):
+        """Returns the cached short URL for url, or None."""
+        key = normalize_url(url)
+        row = self._conn().execute("SELECT short_url, created FROM short_urls WHERE long_url=?", (key,)).fetchone()
+        if row and time.time() - row[1] < self.ttl:
+            with self._lock:
+                self.hits += 1
+            return row[0]
+        with self._lock:
+            self.misses += 1
+        if row:
+            with self._conn() as conn:
+                conn.execute("DELETE FROM short_urls WHERE long_url=?", (key,))
+        return None
+
+    def put(self, url, short_url):
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO short_urls (long_url, short_url, created) VALUES (?, ?, ?)",
+                         (normalize_url(url), short_url, time.time()))
+        with self._lock:
+            self._inserts += 1
+            evict = self._inserts % EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Drops expired entries, then the oldest ones beyond max_entries."""
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM short_urls WHERE created < ?", (time.time() - self.ttl,))
+            excess = conn.execute("SELECT COUNT(*) FROM short_urls").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute("""
+                    DELETE FROM short_urls WHERE long_url IN
+                        (SELECT long_url FROM short_urls ORDER BY created LIMIT ?)
+                """, (excess,))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def base62_encode(n):
+    if n == 0:
+        return BASE62[0]
+    digits = []
+    while n:
+        n, r = divmod(n, 62)
+        digits.append(BASE62[r])
+    return "".join(reversed(digits))
+
+
+def base62_decode(code):
+    n = 0
+    for ch in code:
+        n = n * 62 + BASE62.index(ch)
+    return n
+
+
+class ShortenerBackend:
+    """A way of turning long URLs into short ones. Subclasses implement short()."""
+
+    name = None
+    # whether results are worth keeping in UrlCache (remote backends only)
+    cacheable = False
+
+    def short(self, url):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class TinyUrlBackend(ShortenerBackend):
+    """TinyURL API client sharing one pooled requests.Session across calls and threads."""
+
+    name = 'tinyurl'
+    cacheable = True
+
+    def __init__(self, api_url=TINYURL_API, timeout=REQUEST_TIMEOUT, pool_size=BATCH_WORKERS):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.api_url = api_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def short(self, url):
+        response = self.session.get(self.api_url, params={"url": url.strip()}, timeout=self.timeout)
+        response.raise_for_status()
+        short_url = response.text.strip()
+        if not short_url.startswith(("http://", "https://")):
+            raise ValueError(f"Unexpected response from shortener: {short_url[:80]!r}")
+        return short_url
+
+    def close(self):
+        self.session.close()
+
+
+class LocalBackend(ShortenerBackend):
+    """Offline shortener: base62 codes over a monotonic SQLite row id.
+
+    The code is the row id in base62, so resolving a code is a primary-key
+    lookup, and a unique index on the normalised URL makes shortening the
+    same URL twice return the same code.
+    """
+
+    name = 'local'
+
+    def __init__(self, path=LINKS_DB, base_url=LOCAL_BASE_URL):
+        self.path = path
+        self.base_url = base_url.rstrip("/")
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS links (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL UNIQUE,
+                    created REAL NOT NULL
+                )
+            """)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def code_for(self, url):
+        """Returns the code for url, creating one if it is new."""
+        key = normalize_url(url)
+        conn = self._conn()
+        row = conn.execute("SELECT id FROM links WHERE url=?", (key,)).fetchone()
+        if row is None:
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO links (url, created) VALUES (?, ?)", (key, time.time()))
+                row = conn.execute("SELECT id FROM links WHERE url=?", (key,)).fetchone()
+        return base62_encode(row[0])
+
+    def short(self, url):
+        return f"{self.base_url}/{self.code_for(url)}"
+
+    def resolve(self, code):
+        """Returns the long URL for code, or None."""
+        try:
+            row_id = base62_decode(code)
+        except ValueError:
+            return None
+        row = self._conn().execute("SELECT url FROM links WHERE id=?", (row_id,)).fetchone()
+        return row[0] if row else None
+
+
+BACKENDS = {
+    TinyUrlBackend.name: TinyUrlBackend,
+    LocalBackend.name: LocalBackend,
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name=DEFAULT_BACKEND):
+    """Returns the shared instance of a backend, so repeated calls reuse its connections."""
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+
+def shorten(url, cache=None, backend=None):
+    """Shortens url, answering from cache first for remote backends. Returns (short_url, was_cached)."""
+    backend = backend or get_backend()
+    cache = cache if backend.cacheable else None
+    if cache:
+        short_url = cache.get(url)
+        if short_url:
+            metrics.inc("shortener.cache_hits")
+            return short_url, True
+        metrics.inc("shortener.cache_misses")
+    with metrics.span("shortener." + backend.name):
+        short_url = backend.short(url)
+    if cache:
+        cache.put(url, short_url)
+    return short_url, False
+
+
+def _retryable(error):
+    import requests
+
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and (error.response.status_code == 429 or error.response.status_code >= 500)
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def shorten_with_retry(url, cache=None, backend=None, retries=MAX_RETRIES, backoff=RETRY_BACKOFF):
+    """shorten() with exponential backoff (plus jitter) on timeouts, 429s and 5xx errors."""
+    backend = backend or get_backend()
+    cache = cache if backend.cacheable else None
+    if cache:
+        short_url = cache.get(url)
+        if short_url:
+            metrics.inc("shortener.cache_hits")
+            return short_url, True
+        metrics.inc("shortener.cache_misses")
+    for attempt in range(retries + 1):
+        try:
+            short_url, _ = shorten(url, None, backend)
+            break
+        except Exception as e:
+            if attempt == retries or not _retryable(e):
+                raise
+            metrics.inc("shortener.retries")
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random() / 2))
+    if cache:
+        cache.put(url, short_url)
+    return short_url, False
+
+
+def shorten_many(urls, cache=None, backend=None, workers=BATCH_WORKERS, retries=MAX_RETRIES,
+                 backoff=RETRY_BACKOFF):
+    """Shortens urls concurrently, yielding (index, url, short_url, error) as each completes.
+
+    At most workers * 2 URLs are in flight, so a long input is consumed
+    lazily. Exactly one of short_url and error is None. Closing the
+    generator cancels whatever has not started yet.
+    """
+    backend = backend or get_backend()
+    pool = ThreadPoolExecutor(max_workers=workers)
+    inflight = {}
+
+    def finished():
+        done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+        for future in done:
+            index, url = inflight.pop(future)
+            try:
+                yield index, url, future.result()[0], None
+            except Exception as e:
+                yield index, url, None, str(e)
+
+    try:
+        for index, url in enumerate(urls):
+            url = url.strip()
+            if not url:
+                continue
+            if len(inflight) >= workers * 2:
+                yield from finished()
+            inflight[pool.submit(shorten_with_retry, url, cache, backend, retries, backoff)] = (index, url)
+        while inflight:
+            yield from finished()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# resolver: redirects /<code> to the long URL stored by LocalBackend
+class ResolverHandler(BaseHTTPRequestHandler):
+    backend = None
+
+    def do_GET(self):
+        url = self.backend.resolve(self.path.lstrip("/").split("?")[0])
+        if url:
+            self.send_response(301)
+            self.send_header("Location", url)
+        else:
+            self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_HEAD = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+def make_resolver(backend=None, host=LOCAL_HOST, port=LOCAL_PORT):
+    """Builds (but does not start) the redirect server for a LocalBackend."""
+    handler = type("Handler", (ResolverHandler,), {"backend": backend or get_backend(LocalBackend.name)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local short link resolver")
+    parser.add_argument('--host', default=LOCAL_HOST)
+    parser.add_argument('--port', type=int, default=LOCAL_PORT)
+    parser.add_argument('--db', default=LINKS_DB)
+    args = parser.parse_args(argv)
+
+    server = make_resolver(LocalBackend(args.db), args.host, args.port)
+    print(f"Resolving short links from '{args.db}' on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import csv
+import os
+import re
+import sqlite3
+import string
+import tempfile
+import threading
+import time
+
+# default dispatch rate (messages per second) and burst size
+DEFAULT_RATE = 100
+DEFAULT_BURST = 100
+
+# how often run_campaign reports progress, in processed rows
+PROGRESS_EVERY = 500
+
+NUMBER_RE = re.compile(r"^\+?\d{7,15}$")
+
+
+class SmsSender:
+    """Dispatch backend for campaigns. Subclasses deliver one message per send() call."""
+
+    def send(self, number, msg):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class LogFileSender(SmsSender):
+    """Default backend: records the message in the SMS log, like run_sms."""
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def send(self, number, msg):
+        self.writer.log(number, msg)
+
+
+class TokenBucket:
+    """Blocking token-bucket rate limiter."""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time.sleep((1 - self.tokens) / self.rate)
+
+
+class _SafeDict(dict):
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def check_template(template):
+    """Raises ValueError unless every placeholder in template is a plain {column}.
+
+    format_map would otherwise fail on the first row it renders, e.g. for a
+    positional {0} or a format spec, and stop the campaign part way through.
+    """
+    try:
+        fields = list(string.Formatter().parse(template))
+    except ValueError as e:
+        raise ValueError(f"Invalid campaign message: {e}. Write {{{{ and }}}} for literal braces.") from None
+    for _, field, spec, conversion in fields:
+        if field is None:
+            continue
+        # positional ({}, {0}), attribute and index fields all fail on a dict row
+        if not field or field.isdigit() or "." in field or "[" in field or spec or conversion:
+            placeholder = "{" + field + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "") + "}"
+            raise ValueError(f"Invalid placeholder {placeholder} in the campaign message: "
+                             "use a CSV column name, e.g. {name}.")
+
+
+def normalize_number(number):
+    return re.sub(r"[\s\-().]", "", number or "")
+
+
+# pipeline stages: each takes and yields row dicts, one at a time
+def read_recipients(path):
+    """Yields rows from a CSV with a 'number' column (or numbers in the first column)."""
+    with open(path, newline='', encoding='utf-8') as f:
+        sample = f.readline()
+        f.seek(0)
+        if "number" in [c.strip().lower() for c in next(csv.reader([sample]), [])]:
+            for row in csv.DictReader(f):
+                row = {k.strip().lower(): v for k, v in row.items() if k}
+                yield row
+        else:
+            for fields in csv.reader(f):
+                if fields:
+                    yield {"number": fields[0]}
+
+
+def validate(rows, stats):
+    for row in rows:
+        row["number"] = normalize_number(row.get("number"))
+        if NUMBER_RE.match(row["number"]):
+            yield row
+        else:
+            stats["invalid"] += 1
+
+
+def dedupe(rows, stats):
+    # seen numbers live in a throwaway on-disk table, not in memory
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("CREATE TABLE seen (number TEXT PRIMARY KEY) WITHOUT ROWID")
+        for row in rows:
+            if conn.execute("INSERT OR IGNORE INTO seen VALUES (?)", (row["number"],)).rowcount:
+                yield row
+            else:
+                stats["duplicates"] += 1
+    finally:
+        conn.close()
+        os.remove(path)
+
+
+def render(rows, template):
+    for row in rows:
+        row["message"] = template.format_map(_SafeDict(row))
+        yield row
+
+
+def run_campaign(path, template, sender, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+    """Streams a campaign from a recipients CSV and yields progress dicts.
+
+    Rows flow through validate -> dedupe -> render -> rate limit -> send one
+    at a time, so memory does not grow with the recipient count. `template`
+    may use {column} placeholders from the CSV; check_template() rejects
+    anything else before the first row is read. Stop early by closing the
+    generator (StreamTask does this when cancelled).
+    """
+    check_template(template)
+    stats = {"processed": 0, "sent": 0, "invalid": 0, "duplicates": 0, "failed": 0}
+    bucket = TokenBucket(rate, burst)
+    rows = read_recipients(path)
+    pipeline = render(dedupe(validate(rows, stats), stats), template)
+    reported = 0
+    try:
+        for row in pipeline:
+            bucket.acquire()
+            try:
+                sender.send(row["number"], row["message"])
+                stats["sent"] += 1
+            except Exception:
+                stats["failed"] += 1
+            stats["processed"] = stats["sent"] + stats["failed"] + stats["invalid"] + stats["duplicates"]
+            if stats["processed"] - reported >= PROGRESS_EVERY:
+                reported = stats["processed"]
+                yield dict(stats)
+    finally:
+        pipeline.close()
+    stats["processed"] = stats["sent"] + stats["failed"] + stats["invalid"] + stats["duplicates"]
+    yield dict(stats)
+
+
+def count_lines(path):
+    """Counts lines in a file without loading it, for progress bars."""
+    with open(path, 'rb') as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
@@ -0,0 +1,682 @@
+import datetime
+import gzip
+import mmap
+import os
+import queue
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import ExitStack
+
+import metrics
+
+SMS_LOG_FILE = 'sms_logs.txt'
+
+# durability policies, applied once per batch
+DURABILITY_NONE = 'none'    # leave it to the OS buffer
+DURABILITY_FLUSH = 'flush'  # flush Python's buffer to the OS
+DURABILITY_FSYNC = 'fsync'  # flush and fsync to disk
+
+# most entries written together in one group commit
+MAX_BATCH = 4096
+
+# how often flush() checks that the writer thread is still there
+FLUSH_POLL = 0.1
+
+# a log line, as written by format_entry
+ENTRY_RE = re.compile(r"\[(?P<timestamp>[^\]]*)\] TO: (?P<number>.*?) \| MSG: (?P<msg>.*)")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# a CR or LF would end the entry and let the rest pass for another one
+LINE_BREAKS = str.maketrans({"\r": "\\r", "\n": "\\n"})
+
+# most rows returned by one search
+SEARCH_LIMIT = 1000
+
+# segments: new entries go to SMS_LOG_FILE itself; when it is rotated it is
+# renamed to SMS_LOG_FILE.000001, .000002, ... ("sealed") and gzipped in the
+# background. Rotation happens before a batch once the active file reaches
+# SEGMENT_BYTES, or (if set) once its first entry is SEGMENT_AGE seconds old.
+SEGMENT_BYTES = 8 << 20
+SEGMENT_AGE = None
+COMPRESS_LEVEL = 6
+
+# retention of sealed segments; None keeps them all. The newest sealed
+# segment is never removed, so segment numbers keep counting up.
+RETENTION_SEGMENTS = None
+RETENTION_DAYS = None
+
+# tail(): entries returned by default, and bytes read per step backwards
+TAIL_COUNT = 100
+TAIL_BLOCK = 64 << 10
+
+_STOP = object()
+
+
+def format_entry(number, msg, when=None):
+    """Builds one log line in the '[timestamp] TO: number | MSG: text' format.
+
+    Line breaks in number or msg are written as the two characters \\r / \\n,
+    so an entry always stays on one line.
+    """
+    return _entry(number, msg, when)[0]
+
+
+def _entry(number, msg, when=None):
+    # (line, recipient, timestamp): the fields the index needs, without parsing the line back
+    timestamp = (when or datetime.datetime.now()).strftime(TIMESTAMP_FORMAT)
+    number = str(number).translate(LINE_BREAKS)
+    msg = str(msg).translate(LINE_BREAKS)
+    return f"[{timestamp}] TO: {number} | MSG: {msg}\n", number, timestamp
+
+
+def parse_entry(line):
+    """Splits a log line into timestamp, number and msg. Returns None if it doesn't match."""
+    match = ENTRY_RE.match(line.rstrip("\r\n"))
+    return match.groupdict() if match else None
+
+
+# number: position in the log; path: where it is now; sealed_path: its name
+# once sealed (the same as path except for the active file)
+Segment = namedtuple("Segment", "number path compressed sealed_path")
+
+
+def segment_path(log_path, number):
+    return f"{log_path}.{number:06d}"
+
+
+def list_segments(log_path=SMS_LOG_FILE):
+    """Sealed segments oldest first, then the active file if it exists.
+
+    A segment caught mid-compression (both plain and .gz present) is listed
+    once, as plain.
+    """
+    directory = os.path.dirname(log_path)
+    pattern = re.compile(re.escape(os.path.basename(log_path)) + r"\.(\d{6,})(\.gz)?$")
+    found = {}
+    for name in os.listdir(directory or "."):
+        match = pattern.match(name)
+        if not match:
+            continue
+        number = int(match.group(1))
+        compressed = bool(match.group(2))
+        if number not in found or not compressed:
+            path = os.path.join(directory, name)
+            found[number] = Segment(number, path, compressed, segment_path(log_path, number))
+    segments = [found[n] for n in sorted(found)]
+    if os.path.exists(log_path):
+        number = segments[-1].number + 1 if segments else 1
+        segments.append(Segment(number, log_path, False, segment_path(log_path, number)))
+    return segments
+
+
+def sealed_segments(log_path=SMS_LOG_FILE):
+    return [s for s in list_segments(log_path) if s.path != log_path]
+
+
+def active_segment_number(log_path=SMS_LOG_FILE):
+    sealed = sealed_segments(log_path)
+    return sealed[-1].number + 1 if sealed else 1
+
+
+def open_segment(segment):
+    """Opens a segment for binary reading, following it if it was sealed or
+    compressed after it was listed."""
+    candidates = [segment.path] if segment.compressed else [
+        segment.path, segment.sealed_path, segment.sealed_path + ".gz"]
+    for path in candidates:
+        try:
+            return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+        except FileNotFoundError:
+            continue
+    raise FileNotFoundError(f"SMS log segment {segment.number} is gone")
+
+
+def iter_entries(log_path=SMS_LOG_FILE):
+    """Yields every entry in the log, oldest first, across plain and compressed segments."""
+    for segment in list_segments(log_path):
+        try:
+            f = open_segment(segment)
+        except FileNotFoundError:
+            continue  # removed by retention since it was listed
+        with f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # partially written line
+                entry = parse_entry(raw.decode("utf-8", errors="replace"))
+                if entry:
+                    yield entry
+
+
+def _last_lines(f, count):
+    """The last `count` complete lines of an open segment."""
+    if isinstance(f, gzip.GzipFile):
+        # sealed segments are bounded by SEGMENT_BYTES, so reading one is cheap
+        data = f.read()
+        pos = 0
+    else:
+        pos = f.seek(0, os.SEEK_END)
+        data = b""
+        while pos > 0 and data.count(b"\n") <= count:
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.split(b"\n")
+    lines.pop()  # empty, or a partially written last line
+    if pos > 0:
+        lines.pop(0)  # may start mid-line
+    return lines[-count:] if count else []
+
+
+def tail(log_path=SMS_LOG_FILE, count=TAIL_COUNT):
+    """The newest `count` entries, oldest first.
+
+    Reads the active file backwards and goes to older segments only if it
+    holds fewer entries than asked for, so the cost does not grow with the
+    size of the history.
+    """
+    entries = []
+    for segment in reversed(list_segments(log_path)):
+        if len(entries) >= count:
+            break
+        try:
+            f = open_segment(segment)
+        except FileNotFoundError:
+            continue
+        with f:
+            lines = _last_lines(f, count - len(entries))
+        parsed = [parse_entry(raw.decode("utf-8", errors="replace")) for raw in lines]
+        entries[:0] = [e for e in parsed if e]
+    return entries[-count:] if count else []
+
+
+def compress_segment(segment, level=COMPRESS_LEVEL):
+    """Replaces a sealed plain segment with a gzipped copy (same mtime)."""
+    target = segment.path + ".gz"
+    if not os.path.exists(target):
+        tmp = target + ".tmp"
+        with open(segment.path, "rb") as src, gzip.open(tmp, "wb", compresslevel=level) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        stat = os.stat(segment.path)
+        os.utime(tmp, (stat.st_atime, stat.st_mtime))
+        os.replace(tmp, target)
+    os.remove(segment.path)
+
+
+def apply_retention(log_path=SMS_LOG_FILE, max_segments=RETENTION_SEGMENTS, max_days=RETENTION_DAYS, now=None):
+    """Deletes sealed segments beyond the newest max_segments or older than max_days.
+
+    Returns the numbers of the deleted segments. The newest sealed segment
+    is always kept.
+    """
+    sealed = sealed_segments(log_path)
+    cutoff = (now or time.time()) - max_days * 86400 if max_days is not None else None
+    keep = max(1, max_segments) if max_segments is not None else len(sealed)
+    removed = []
+    for i, segment in enumerate(sealed[:-1]):
+        too_many = len(sealed) - i > keep
+        try:
+            too_old = cutoff is not None and os.path.getmtime(segment.path) < cutoff
+            if too_many or too_old:
+                os.remove(segment.path)
+                removed.append(segment.number)
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+class SegmentCompressor:
+    """Background thread that gzips sealed segments and applies retention.
+
+    sweep() only queues a pass; each pass handles every sealed segment still
+    uncompressed, so segments left plain by an earlier crash are picked up too.
+    """
+
+    def __init__(self, log_path=SMS_LOG_FILE, level=COMPRESS_LEVEL,
+                 retention_segments=RETENTION_SEGMENTS, retention_days=RETENTION_DAYS):
+        self.log_path = log_path
+        self.level = level
+        self.retention_segments = retention_segments
+        self.retention_days = retention_days
+        self.compressed = 0
+        self.removed = 0
+        self.error = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="sms-log-compressor", daemon=True)
+        self._thread.start()
+
+    def sweep(self):
+        self._queue.put(True)
+
+    def flush(self, timeout=None):
+        """Blocks until every pass queued so far has finished."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Finishes queued passes and stops the thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _pass(self):
+        for segment in sealed_segments(self.log_path):
+            if not segment.compressed:
+                with metrics.span("sms_log.compress_segment"):
+                    compress_segment(segment, self.level)
+                self.compressed += 1
+        self.removed += len(apply_retention(self.log_path, self.retention_segments, self.retention_days))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            try:
+                self._pass()
+            except OSError as e:
+                # a reader holding a file open (Windows) or a full disk; the next pass retries
+                self.error = str(e)
+
+
+class SmsLogIndex:
+    """Sidecar SQLite index over a segmented SMS log.
+
+    Each log line is recorded as (segment, byte offset, recipient, timestamp)
+    with B-tree indexes on recipient+timestamp and on timestamp, so lookups
+    by number or time range touch only the matching lines. The lines
+    themselves are read back through a memory map of plain segments, or by
+    decompressing the (bounded) gzipped ones.
+    """
+
+    def __init__(self, log_path=SMS_LOG_FILE, index_path=None):
+        self.log_path = log_path
+        self.index_path = index_path or log_path + ".idx"
+        self.conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        with self.conn:
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(entries)")]
+            if columns and "segment" not in columns:
+                # built before the log had segments; it is only a cache, so rebuild it
+                self.conn.execute("DROP TABLE entries")
+                self.conn.execute("DROP TABLE IF EXISTS meta")
+            elif columns and "WITHOUT ROWID" not in self._table_sql("entries"):
+                # an older rowid table costs an extra B-tree per entry written; rebuild it too
+                self.conn.execute("DROP TABLE entries")
+                self.conn.execute("DROP TABLE IF EXISTS segments")
+            # keyed by position alone, so each entry is one row plus its two index entries
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    segment INTEGER NOT NULL,
+                    offset INTEGER NOT NULL,
+                    recipient TEXT NOT NULL,
+                    ts TEXT NOT NULL,
+                    PRIMARY KEY (segment, offset)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_recipient ON entries (recipient, ts)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_ts ON entries (ts)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS segments (number INTEGER PRIMARY KEY, indexed_upto INTEGER)")
+
+    def _table_sql(self, name):
+        row = self.conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone()
+        return row[0] if row else ""
+
+    def indexed_upto(self, segment):
+        row = self.conn.execute("SELECT indexed_upto FROM segments WHERE number=?", (segment,)).fetchone()
+        return row[0] if row else 0
+
+    def add(self, segment, rows, end_offset):
+        """Records (offset, recipient, timestamp) rows covering a segment up to end_offset."""
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO entries (segment, offset, recipient, ts) VALUES (?, ?, ?, ?)",
+                                  ((segment, *row) for row in rows))
+            self.conn.execute("""
+                INSERT INTO segments (number, indexed_upto) VALUES (?, ?)
+                ON CONFLICT(number) DO UPDATE SET indexed_upto=MAX(indexed_upto, excluded.indexed_upto)
+            """, (segment, end_offset))
+
+    def drop(self, segment):
+        with self.conn:
+            self.conn.execute("DELETE FROM entries WHERE segment=?", (segment,))
+            self.conn.execute("DELETE FROM segments WHERE number=?", (segment,))
+
+    def catch_up(self):
+        """Indexes complete lines not indexed yet. Returns the end offset of the active segment.
+
+        Segments deleted by retention are dropped from the index. Sealed
+        segments are only read if they were never indexed (say, after the
+        index file was deleted); normally only the active file is scanned.
+        """
+        segments = list_segments(self.log_path)
+        present = {s.number for s in segments}
+        for (number,) in self.conn.execute("SELECT number FROM segments").fetchall():
+            if number not in present:
+                self.drop(number)
+
+        end = 0
+        for segment in segments:
+            start = self.indexed_upto(segment.number)
+            if segment.compressed and start:
+                continue
+            if not segment.compressed:
+                try:
+                    if os.path.getsize(segment.path) < start:
+                        # truncated or replaced, start over
+                        self.drop(segment.number)
+                        start = 0
+                except FileNotFoundError:
+                    pass
+            try:
+                end = self._index_segment(segment, start)
+            except FileNotFoundError:
+                continue
+        return end
+
+    def _index_segment(self, segment, start):
+        rows = []
+        offset = start
+        with open_segment(segment) as f:
+            f.seek(start)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # partially written line, pick it up next time
+                entry = parse_entry(raw.decode("utf-8", errors="replace"))
+                if entry:
+                    rows.append((offset, entry["number"], entry["timestamp"]))
+                offset += len(raw)
+                if len(rows) >= MAX_BATCH:
+                    self.add(segment.number, rows, offset)
+                    rows = []
+        self.add(segment.number, rows, offset)
+        return offset
+
+    def search(self, recipient=None, start=None, end=None, prefix=False, limit=SEARCH_LIMIT):
+        """Returns matching entries, newest first.
+
+        start/end are datetimes or 'YYYY-MM-DD HH:MM:SS' strings (inclusive).
+        With prefix=True, recipient matches any number starting with it.
+        """
+        clauses = []
+        params = []
+        if recipient:
+            if prefix:
+                clauses.append("recipient >= ? AND recipient < ?")
+                params += [recipient, recipient + "\U0010ffff"]
+            else:
+                clauses.append("recipient = ?")
+                params.append(recipient)
+        if start:
+            clauses.append("ts >= ?")
+            params.append(_ts(start))
+        if end:
+            clauses.append("ts <= ?")
+            params.append(_ts(end))
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        locations = self.conn.execute(
+            f"SELECT segment, offset FROM entries {where} ORDER BY ts DESC, segment DESC, offset DESC LIMIT ?",
+            params + [limit]).fetchall()
+        return self.read_entries(locations)
+
+    def read_entries(self, locations):
+        """Reads the lines at (segment, offset) locations, in the order given."""
+        if not locations:
+            return []
+        segments = {s.number: s for s in list_segments(self.log_path)}
+        results = []
+        with ExitStack() as stack:
+            views = {}
+            for number, offset in locations:
+                if number not in views:
+                    views[number] = self._view(stack, segments.get(number))
+                data = views[number]
+                if data is None or offset >= len(data):
+                    continue
+                end = data.find(b"\n", offset)
+                entry = parse_entry(data[offset:end if end != -1 else len(data)].decode("utf-8", errors="replace"))
+                if entry:
+                    results.append(entry)
+        return results
+
+    @staticmethod
+    def _view(stack, segment):
+        """A memory map of a plain segment, or the bytes of a compressed one."""
+        if segment is None:
+            return None
+        try:
+            f = stack.enter_context(open_segment(segment))
+        except FileNotFoundError:
+            return None
+        if isinstance(f, gzip.GzipFile):
+            return f.read()
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self):
+        self.conn.close()
+
+
+def _ts(value):
+    if isinstance(value, datetime.datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    return value
+
+
+def search(log_path=SMS_LOG_FILE, **query):
+    """Indexes any new lines of log_path, then runs SmsLogIndex.search(**query)."""
+    index = SmsLogIndex(log_path)
+    try:
+        index.catch_up()
+        return index.search(**query)
+    finally:
+        index.close()
+
+
+def _segment_started(path):
+    """When the active file's first entry was written (its mtime if unreadable)."""
+    try:
+        with open(path, "rb") as f:
+            entry = parse_entry(f.readline().decode("utf-8", errors="replace"))
+        if entry:
+            return time.mktime(time.strptime(entry["timestamp"], TIMESTAMP_FORMAT))
+        return os.path.getmtime(path)
+    except (OSError, ValueError):
+        return time.time()
+
+
+class SmsLogWriter:
+    """Appends SMS log entries from a background thread with group commit.
+
+    log() only queues the line. The writer thread takes everything that has
+    queued up (up to MAX_BATCH entries), writes it with a single call on its
+    long-lived handle and then applies the durability policy once for the
+    whole batch. With index=True each batch is also added to the sidecar
+    SmsLogIndex, so the index grows with the log.
+
+    Before a batch, the active file is sealed as the next numbered segment
+    once it reaches segment_bytes (or segment_age seconds); with
+    compress=True a SegmentCompressor gzips sealed segments and applies the
+    retention settings in the background.
+    """
+
+    def __init__(self, path=SMS_LOG_FILE, durability=DURABILITY_FLUSH, max_batch=MAX_BATCH,
+                 on_error=None, index=True, segment_bytes=SEGMENT_BYTES, segment_age=SEGMENT_AGE,
+                 compress=True, retention_segments=RETENTION_SEGMENTS, retention_days=RETENTION_DAYS):
+        if durability not in (DURABILITY_NONE, DURABILITY_FLUSH, DURABILITY_FSYNC):
+            raise ValueError(f"Unknown durability policy: {durability}")
+        self.path = path
+        self.durability = durability
+        self.max_batch = max_batch
+        self.on_error = on_error
+        self.segment_bytes = segment_bytes
+        self.segment_age = segment_age
+        self.entries_written = 0
+        self.batches_written = 0
+        self.segments_sealed = 0
+        self.error = None
+        self.closed = False
+        self._queue = queue.Queue()
+        self._file = open(path, "ab")
+        self._offset = self._file.tell()
+        self._segment = active_segment_number(path)
+        self._segment_started = _segment_started(path) if self._offset else None
+        self._index = SmsLogIndex(path) if index else None
+        self._compressor = SegmentCompressor(path, retention_segments=retention_segments,
+                                             retention_days=retention_days) if compress else None
+        if self._compressor:
+            # segments sealed but not compressed by an earlier run
+            self._compressor.sweep()
+        self._thread = threading.Thread(target=self._run, name="sms-log-writer", daemon=True)
+        self._thread.start()
+
+    def log(self, number, msg, when=None):
+        """Queues one message for the log."""
+        if self.error:
+            raise OSError(self.error)
+        if self.closed:
+            raise OSError("SMS log writer is closed")
+        self._queue.put(_entry(number, msg, when))
+
+    def flush(self, timeout=None):
+        """Blocks until every entry queued so far has been committed.
+
+        Returns False on timeout and raises OSError once the writer has
+        failed. After close() everything is already committed.
+        """
+        if self.error:
+            raise OSError(self.error)
+        if self.closed or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # a thread that dies before reaching the marker never sets it
+        while not done.wait(FLUSH_POLL):
+            if not self._thread.is_alive() or (deadline is not None and time.monotonic() >= deadline):
+                break
+        if self.error:
+            raise OSError(self.error)
+        return done.is_set()
+
+    def close(self):
+        """Commits everything still queued, then closes the file."""
+        self.closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _should_rotate(self):
+        if not self._offset:
+            return False
+        if self.segment_bytes and self._offset >= self.segment_bytes:
+            return True
+        return bool(self.segment_age) and time.time() - self._segment_started >= self.segment_age
+
+    def _rotate(self):
+        """Seals the active file as the next numbered segment and starts a new one."""
+        self._file.close()
+        try:
+            os.replace(self.path, segment_path(self.path, self._segment))
+        except OSError:
+            # held open elsewhere (Windows); keep appending and retry next batch
+            self._file = open(self.path, "ab")
+            return
+        self._file = open(self.path, "ab")
+        self._segment += 1
+        self._offset = 0
+        self._segment_started = None
+        self.segments_sealed += 1
+        if self._compressor:
+            self._compressor.sweep()
+
+    def _commit(self, entries):
+        if self._should_rotate():
+            self._rotate()
+        if self._segment_started is None:
+            self._segment_started = time.time()
+
+        data = [line.encode("utf-8") for line, _, _ in entries]
+        self._file.write(b"".join(data))
+        if self.durability != DURABILITY_NONE or self._index:
+            self._file.flush()
+        if self.durability == DURABILITY_FSYNC:
+            os.fsync(self._file.fileno())
+
+        if self._index:
+            # one index transaction per batch, from the fields queued by log()
+            rows = []
+            offset = self._offset
+            for raw, (_, number, timestamp) in zip(data, entries):
+                rows.append((offset, number, timestamp))
+                offset += len(raw)
+            self._offset = offset
+            self._index.add(self._segment, rows, self._offset)
+        else:
+            self._offset += sum(map(len, data))
+        self.entries_written += len(entries)
+        self.batches_written += 1
+
+    def _run(self):
+        stopping = False
+        waiters = []
+        try:
+            if self._index:
+                # index anything written before this writer opened the log
+                self._offset = self._index.catch_up()
+            while not stopping:
+                entries = []
+                waiters = []
+                item = self._queue.get()
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        entries.append(item)
+                    if stopping or len(entries) >= self.max_batch:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if entries:
+                    with metrics.span("sms_log.commit_batch"):
+                        self._commit(entries)
+                    metrics.inc("sms_log.messages", len(entries))
+                if waiters:
+                    self._file.flush()
+                    for done in waiters:
+                        done.set()
+        except Exception as e:
+            self.error = str(e)
+            if self.on_error:
+                self.on_error(self.error)
+            # release anyone waiting in flush(), including markers taken with the failed batch
+            for done in waiters:
+                done.set()
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    item.set()
+        finally:
+            self._file.close()
+            if self._index:
+                self._index.close()
+            if self._compressor:
+                self._compressor.close()
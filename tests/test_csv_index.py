@@ -0,0 +1,41 @@
+import csv
+
+from csv_index import CsvRowIndex, filter_rows
+
+
+def matching_rows(index, needle, **kwargs):
+    return [row for rows in filter_rows(index, needle, **kwargs) for row in rows]
+
+
+def make_index(tmp_path, names):
+    path = tmp_path / "generated_data.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Name", "Email"])
+        for name in names:
+            writer.writerow([name, "someone@example.com"])
+    index = CsvRowIndex(str(path))
+    index.catch_up()
+    return index
+
+
+def test_filter_rows_ignores_non_ascii_case(tmp_path):
+    index = make_index(tmp_path, ["Ann Lee", "ÉMILE Zoë", "Bob Stone"])
+    try:
+        assert matching_rows(index, "ÉMILE") == [1]
+        assert matching_rows(index, "émile") == [1]
+        assert matching_rows(index, "ZOË") == [1]
+        assert matching_rows(index, "emile") == []
+    finally:
+        index.close()
+
+
+def test_filter_rows_non_ascii_across_blocks(tmp_path):
+    names = [f"Zoë {i}" if i % 3 == 0 else f"Ann {i}" for i in range(300)]
+    index = make_index(tmp_path, names)
+    try:
+        expected = [i for i in range(300) if i % 3 == 0]
+        assert matching_rows(index, "zoë", block=256) == expected
+        assert matching_rows(index, "ANN", block=256) == [i for i in range(300) if i % 3]
+    finally:
+        index.close()
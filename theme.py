@@ -0,0 +1,199 @@
+# app-wide styling (dark theme)
+#
+# Every style lives in this one stylesheet, applied once to the QApplication.
+# Widgets pick their look with setObjectName() and the dynamic properties
+# "variant" (button colour) and "state" (runtime state such as "copied"),
+# so changing state is a property flip and re-polish, not a new stylesheet.
+
+STYLESHEET = """
+    /* Main Background - Dark Gradient */
+    QMainWindow {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
+                                    stop:0 #2b5876, stop:1 #4e4376);
+    }
+    QWidget {
+        font-family: 'Segoe UI', sans-serif;
+        font-size: 14px;
+        color: #ecf0f1;
+    }
+
+    QWidget#DiagnosticsPanel {
+        background-color: #1e272e;
+    }
+
+    /* The Cards (Dark Glass Effect) */
+    QFrame#LoginCard {
+        background-color: #1e272e;
+        border-radius: 20px;
+        border: 1px solid #353b48;
+    }
+
+    /* Input Fields */
+    QLineEdit {
+        background-color: #2f3640;
+        border: 2px solid #353b48;
+        border-radius: 10px;
+        padding: 12px;
+        color: #f5f6fa;
+        selection-background-color: #00a8ff;
+    }
+    QLineEdit:focus {
+        border: 2px solid #00a8ff;
+        background-color: #353b48;
+    }
+    QLineEdit#ToolInput {
+        padding: 14px;
+        font-size: 14px;
+    }
+    QLineEdit#FilterInput {
+        padding: 8px;
+    }
+    QLineEdit#ResultOutput {
+        color: #00a8ff;
+        font-weight: bold;
+    }
+
+    /* Dashboard panels and small inputs (and their scrollbars/headers) */
+    QPlainTextEdit, QPlainTextEdit *, QListView, QListView *, QTableView, QTableView *,
+    QSpinBox, QComboBox, QDateTimeEdit {
+        background-color: #2f3640;
+        border: 2px solid #353b48;
+        border-radius: 10px;
+        padding: 8px;
+        color: #f5f6fa;
+    }
+    QSpinBox, QComboBox {
+        padding: 10px;
+    }
+    QListView#IdentityHistory, QListView#IdentityHistory * {
+        padding: 12px;
+    }
+    QTableView, QTableView * {
+        padding: 0px;
+    }
+
+    /* Headings */
+    QLabel#Header {
+        font-size: 28px;
+        font-weight: 800;
+        color: #f5f6fa;
+        margin-bottom: -10px;
+    }
+    QLabel#SubHeader {
+        font-size: 15px;
+        color: #dcdde1;
+        font-weight: 500;
+    }
+    QLabel#UserGreeting {
+        color: #00a8ff;
+        font-weight: 800;
+        font-size: 18px;
+    }
+    QLabel#SectionTitle {
+        font-weight: bold;
+        color: #f5f6fa;
+        font-size: 16px;
+    }
+    QLabel#FieldLabel {
+        color: #dcdde1;
+    }
+    QLabel#HintLabel {
+        color: #7f8fa6;
+        font-size: 12px;
+    }
+
+    /* Tabs */
+    QTabWidget::pane {
+        border: 1px solid #353b48;
+        background: #1e272e;
+        border-radius: 15px;
+    }
+    QTabBar::tab {
+        background: #2f3640;
+        color: #dcdde1;
+        padding: 12px 25px;
+        border-radius: 20px;
+        font-weight: 600;
+        margin-right: 10px;
+        margin-bottom: 10px;
+        border: 1px solid #353b48;
+    }
+    QTabBar::tab:selected {
+        background: #00a8ff;
+        color: white;
+        border: 1px solid #00a8ff;
+    }
+    QTabBar::tab:hover {
+        background: #353b48;
+    }
+    QTabBar:focus { outline: none; }
+
+    /* Buttons */
+    QPushButton {
+        border-radius: 10px;
+        padding: 12px;
+        font-weight: bold;
+        font-size: 15px;
+        border: none;
+        outline: 0;
+        color: white;
+    }
+    QPushButton:focus {
+        outline: none;
+    }
+    QPushButton#ToolAction { font-size: 14px; }
+    QPushButton[size="small"] { padding: 10px; }
+
+    QPushButton[variant="primary"] { background-color: #00a8ff; }
+    QPushButton[variant="primary"]:hover { background-color: #0097e6; }
+    QFrame#LoginCard QPushButton[variant="primary"]:hover,
+    QFrame#LoginCard QPushButton[variant="success"]:hover { margin-top: 2px; }
+
+    QPushButton[variant="success"] { background-color: #4cd137; }
+    QPushButton[variant="success"]:hover { background-color: #44bd32; }
+
+    QPushButton[variant="secondary"] { background-color: #718093; }
+    QPushButton[variant="secondary"]:hover { background-color: #7f8fa6; }
+
+    QPushButton[variant="warning"] { background-color: #e1b12c; }
+    QPushButton[variant="warning"]:hover { background-color: #fbc531; }
+
+    QPushButton[variant="warning-outline"] { background-color: transparent; color: #e1b12c; border: 2px solid #e1b12c; }
+    QPushButton[variant="warning-outline"]:hover { background-color: #353b48; }
+
+    QPushButton[variant="accent"] { background-color: #9c88ff; }
+    QPushButton[variant="accent"]:hover { background-color: #8c7ae6; }
+
+    QPushButton[variant="danger"] { background-color: #e84118; padding: 10px; }
+    QPushButton[variant="danger"]:hover { background-color: #c23616; }
+
+    QPushButton[variant="outline"] { background-color: transparent; color: #dcdde1; border: 2px solid #718093; }
+    QPushButton[variant="outline"]:hover { background-color: #718093; color: white; }
+
+    QPushButton[variant="link"] { background-color: transparent; color: #7f8fa6; }
+    QPushButton[variant="link"]:hover { color: #f5f6fa; }
+
+    /* runtime states */
+    QPushButton[state="copied"], QPushButton[state="copied"]:hover { background-color: #4cd137; }
+
+    /* Checkbox Styling */
+    QCheckBox { color: #dcdde1; font-size: 13px; font-weight: 600; spacing: 8px;}
+    QCheckBox::indicator { width: 18px; height: 18px; border: 2px solid #7f8fa6; border-radius: 4px; background: #2f3640;}
+    QCheckBox::indicator:checked { background-color: #00a8ff; border: 2px solid #00a8ff; }
+"""
+
+
+def apply(app):
+    """Installs the theme on the QApplication (once)."""
+    if app.styleSheet() != STYLESHEET:
+        app.setStyleSheet(STYLESHEET)
+
+
+def set_property(widget, name, value):
+    """Changes a styling property and re-polishes just this widget."""
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
+
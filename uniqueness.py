@@ -0,0 +1,286 @@
+import csv
+import hashlib
+import math
+import os
+import random
+import sqlite3
+import struct
+import threading
+
+from identity_gen import generate_identities
+
+# columns kept in the index; callers choose which of them must be unique
+UNIQUE_COLUMNS = ('Name', 'Email')
+
+# Bloom filter sizing: starting capacity (keys) and false-positive rate
+BLOOM_CAPACITY = 1_000_000
+BLOOM_ERROR_RATE = 0.01
+BLOOM_MAGIC = b"SIABLM1\0"
+BLOOM_HEADER = struct.Struct("<8sQQQQ")  # magic, bits, hashes, capacity, keys
+
+# keys per IN (...) lookup (stays under the default 999 parameter limit)
+SQL_BATCH = 900
+
+# keys per transaction while indexing an existing CSV
+CATCH_UP_BATCH = 10_000
+
+# extra generation rounds to replace rejected duplicates before giving up
+MAX_TOPUP_ROUNDS = 10
+
+
+def normalize_key(column, value):
+    return f"{column}\x1f{(value or '').strip().lower()}"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over str keys, with double hashing from one BLAKE2b digest."""
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE, bits=None, hashes=None):
+        self.capacity = capacity
+        self.bits = bits or max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = hashes or max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.keys = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, key):
+        for p in self._positions(key):
+            self.array[p >> 3] |= 1 << (p & 7)
+        self.keys += 1
+
+    def __contains__(self, key):
+        array = self.array
+        return all(array[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    @property
+    def full(self):
+        return self.keys > self.capacity
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, self.bits, self.hashes, self.capacity, self.keys))
+            f.write(self.array)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Returns the saved filter, or None if the file is missing or unreadable."""
+        try:
+            with open(path, "rb") as f:
+                magic, bits, hashes, capacity, keys = BLOOM_HEADER.unpack(f.read(BLOOM_HEADER.size))
+                if magic != BLOOM_MAGIC:
+                    return None
+                bloom = cls(capacity, bits=bits, hashes=hashes)
+                f.readinto(bloom.array)
+        except (OSError, struct.error):
+            return None
+        bloom.keys = keys
+        return bloom
+
+
+class UniqueIndex:
+    """Remembers every Name/Email already in a CSV so new identities can avoid them.
+
+    The exact set of keys lives in a sidecar SQLite table; a Bloom filter in
+    front of it (saved next to it) answers most "never seen" lookups without
+    touching disk. Keys handed out but not yet saved are held in memory as
+    reservations until commit() or release().
+
+    Rows appended to the CSV by anything else are picked up on open, from the
+    last indexed byte offset, as with the SMS log index.
+    """
+
+    def __init__(self, csv_path, index_path=None, bloom_path=None):
+        self.csv_path = csv_path
+        self.index_path = index_path or csv_path + ".uniq"
+        self.bloom_path = bloom_path or csv_path + ".bloom"
+        self.reserved = set()
+        self.closed = False
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS keys (key TEXT PRIMARY KEY) WITHOUT ROWID")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+
+        self.bloom = BloomFilter.load(self.bloom_path)
+        if self.bloom is None or self.bloom.keys != self._meta("keys"):
+            self._rebuild_bloom()
+        self.catch_up()
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                          "ON CONFLICT(key) DO UPDATE SET value=excluded.value", (key, value))
+
+    def _rebuild_bloom(self):
+        keys = self.conn.execute("SELECT count(*) FROM keys").fetchone()[0]
+        self.bloom = BloomFilter(max(BLOOM_CAPACITY, keys * 2))
+        for (key,) in self.conn.execute("SELECT key FROM keys"):
+            self.bloom.add(key)
+        with self.conn:
+            self._set_meta("keys", keys)
+
+    def _insert(self, keys):
+        """Adds keys to the table and filter in one transaction. Caller holds the lock."""
+        with self.conn:
+            insert = self.conn.execute
+            for key in keys:
+                # only keys the table did not have go into the filter, so its
+                # key count stays equal to the table's
+                if insert("INSERT OR IGNORE INTO keys (key) VALUES (?)", (key,)).rowcount:
+                    self.bloom.add(key)
+            self._set_meta("keys", self.bloom.keys)
+        if self.bloom.full:
+            self._rebuild_bloom()
+
+    def _existing(self, keys):
+        """The subset of keys already in the table."""
+        found = set()
+        for i in range(0, len(keys), SQL_BATCH):
+            batch = keys[i:i + SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            found.update(k for (k,) in self.conn.execute(f"SELECT key FROM keys WHERE key IN ({placeholders})", batch))
+        return found
+
+    def catch_up(self):
+        """Indexes CSV rows appended since the last indexed offset."""
+        if not os.path.exists(self.csv_path):
+            return
+        with self._lock:
+            start = self._meta("indexed_upto")
+            size = os.path.getsize(self.csv_path)
+            if size < start:
+                # the CSV was truncated or replaced, start over
+                with self.conn:
+                    self.conn.execute("DELETE FROM keys")
+                    self._set_meta("indexed_upto", 0)
+                self._rebuild_bloom()
+                start = 0
+            if size == start:
+                return
+
+            with open(self.csv_path, "rb") as f:
+                header = next(csv.reader([f.readline().decode("utf-8")]), [])
+                columns = [(c, header.index(c)) for c in UNIQUE_COLUMNS if c in header]
+                if start:
+                    f.seek(start)
+                lines = _CompleteLines(f)
+                keys = []
+                for fields in csv.reader(lines):
+                    if len(fields) < len(header):
+                        continue
+                    keys.extend(normalize_key(c, fields[i]) for c, i in columns)
+                    if len(keys) >= CATCH_UP_BATCH:
+                        self._insert(keys)
+                        keys = []
+            self._insert(keys)
+            with self.conn:
+                self._set_meta("indexed_upto", lines.offset)
+
+    def filter(self, rows, columns=UNIQUE_COLUMNS):
+        """Returns the rows whose `columns` values are new, and reserves those values.
+
+        Checks the filter first; only keys it might have seen are looked up in
+        SQLite. Duplicates within `rows` keep their first occurrence.
+        """
+        with self._lock:
+            self._check_open()
+            candidates = [(row, [normalize_key(c, row.get(c)) for c in columns]) for row in rows]
+            maybe = [k for _, keys in candidates for k in keys if k in self.bloom]
+            existing = self._existing(maybe) if maybe else set()
+
+            fresh = []
+            for row, keys in candidates:
+                if any(k in existing or k in self.reserved for k in keys):
+                    continue
+                self.reserved.update(keys)
+                fresh.append(row)
+            return fresh
+
+    def commit(self, rows):
+        """Records rows that were written to the CSV."""
+        with self._lock:
+            self._check_open()
+            keys = [normalize_key(c, row.get(c)) for row in rows for c in UNIQUE_COLUMNS]
+            self._insert(keys)
+            self.reserved.difference_update(keys)
+
+    def release(self):
+        """Forgets reservations for rows that were never saved."""
+        with self._lock:
+            self.reserved.clear()
+
+    def close(self):
+        """Indexes the rest of the CSV and saves the filter.
+
+        Call after the CSV writer has been closed. Rows appended by anyone
+        else since the last catch_up() are indexed too, rather than skipped.
+        """
+        if self.closed:
+            return
+        self.catch_up()
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.bloom.save(self.bloom_path)
+            self.conn.close()
+
+    def _check_open(self):
+        if self.closed:
+            raise RuntimeError("uniqueness index is closed")
+
+
+class _CompleteLines:
+    """Iterates decoded lines from a binary file, stopping at a partial last line."""
+
+    def __init__(self, f):
+        self.f = f
+        self.offset = f.tell()
+
+    def __iter__(self):
+        for raw in self.f:
+            if not raw.endswith(b"\n"):
+                return  # partially written row, pick it up next time
+            self.offset += len(raw)
+            yield raw.decode("utf-8", errors="replace")
+
+
+def generate_unique(count, index, columns=('Email',), seed=None, workers=None, max_rounds=MAX_TOPUP_ROUNDS,
+                    locales=()):
+    """Like generate_identities(), but skips rows whose `columns` were seen before.
+
+    Rejected rows are replaced by further rounds of generation (each with a
+    seed derived from `seed`) until `count` rows are out or a round adds
+    nothing new. Accepted rows are only reserved in `index`; commit them
+    once they are written (pass index.commit as CsvWriter's on_written).
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    remaining = count
+    for round_no in range(max_rounds):
+        if remaining <= 0:
+            return
+        chunks = generate_identities(remaining, (seed + round_no) % 2 ** 32, workers, locales=locales)
+        added = 0
+        try:
+            for chunk in chunks:
+                fresh = index.filter(chunk, columns)
+                if fresh:
+                    added += len(fresh)
+                    yield fresh
+        finally:
+            chunks.close()
+        remaining -= added
+        if not added:
+            return
@@ -1,26 +1,108 @@
-import pyshorteners
-import csv 
-import os 
-import datetime
-from faker import Faker
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QLineEdit, QPushButton, QMessageBox, 
-                             QTabWidget, QTextEdit, QApplication)
-from PyQt6.QtCore import Qt, QTimer
+                             QTabWidget, QListView, QApplication, QSpinBox, QProgressBar,
+                             QListWidget, QDateTimeEdit, QFileDialog, QPlainTextEdit,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QComboBox, QTableView)
+from PyQt6.QtCore import Qt, QTimer, QDateTime, pyqtSignal
+from identity_gen import (FIELDNAMES, get_faker, make_identity, generate_identities, warm_fakers,
+                          configured_locales, format_locales, parse_locales, pick_locale)
+from workers import abandon, run_task, run_stream
+from models import IdentityListModel, SavedDataModel
+from csv_writer import CsvWriter, write_through
+from identity_store import StoreWriter
+from csv_index import CsvRowIndex, filter_rows
+from sms_log import SMS_LOG_FILE, SmsLogWriter, search as search_sms_log
+from sms_campaign import LogFileSender, check_template, run_campaign, count_lines
+from shortener import UrlCache, get_backend, shorten, shorten_many
+from uniqueness import UniqueIndex, generate_unique
+import database
+import metrics
+import theme
 
 CSV_FILE = 'generated_data.csv'
-SMS_LOG_FILE = 'sms_logs.txt'
+
+# fresh identities to try per click before giving up in unique mode
+MAX_UNIQUE_ATTEMPTS = 50
+
+# pause after the last keystroke before the saved data filter runs
+FILTER_DELAY_MS = 300
 
 class UtilityScreen(QWidget):
-    def __init__(self, logout_callback, current_user):
+    # emitted from the background writer threads
+    csv_error = pyqtSignal(str)
+    sms_error = pyqtSignal(str)
+
+    def __init__(self, logout_callback, current_user, admin_callback=None):
         super().__init__()
+        self.setObjectName("Dashboard")
         self.logout_callback = logout_callback
+        self.admin_callback = admin_callback
         self.current_user = current_user
-        self.fake = Faker()
         self.session_data = [] 
+        self.batch_task = None
+        self.csv_writer = None
+        self.identity_store = None
+        self.sms_log = None
+        self.sms_search_task = None
+        self.campaign_task = None
+        self.url_cache = None
+        self.url_batch_task = None
+        self.unique_index = None
+        self.unique_index_task = None
+        self.locale_task = None
+        self.saved_index = None
+        self.saved_index_task = None
+        self.saved_refresh_pending = False
+        self.saved_filter_task = None
+        self.csv_error.connect(self.on_csv_error)
+        self.sms_error.connect(self.on_sms_error)
         
         self.init_ui()
 
+    @property
+    def fake(self):
+        # shared and built on first use; faker is slow to import and set up
+        return get_faker()
+
+    def shutdown(self):
+        """Stops background work and drains pending writes. Called on logout."""
+        for name in ('batch_task', 'campaign_task', 'url_batch_task', 'sms_search_task', 'unique_index_task',
+                     'locale_task', 'saved_index_task', 'saved_filter_task'):
+            task = getattr(self, name)
+            if task:
+                abandon(task)
+                setattr(self, name, None)
+        if self.csv_writer:
+            self.csv_writer.close()
+            self.csv_writer = None
+        if self.identity_store:
+            self.identity_store.close()
+            self.identity_store = None
+        # after the writer, so everything it wrote is already committed
+        if self.unique_index:
+            self.unique_index.close()
+            self.unique_index = None
+        if self.sms_log:
+            self.sms_log.close()
+            self.sms_log = None
+        if self.saved_index:
+            self.saved_index.close()
+            self.saved_index = None
+        self.saved_refresh_pending = False
+
+    def start_session(self, current_user):
+        """Readies this screen for the next user instead of building a new one."""
+        self.shutdown()
+        self.current_user = current_user
+        self.session_data = []
+        self.lbl_user.setText(f"Hello, {self.current_user}")
+        self.btn_admin.setVisible(self.can_admin())
+        for index, reset in enumerate(self.tab_resets):
+            # tabs that were never opened have nothing to reset
+            if self.tab_builders[index] is None:
+                reset()
+        self.tabs.setCurrentIndex(0)
+
     def init_ui(self):
         main_layout = QVBoxLayout()
         main_layout.setContentsMargins(40, 40, 40, 40) 
@@ -29,192 +111,336 @@ class UtilityScreen(QWidget):
         header_layout = QHBoxLayout()
         header_layout.addStretch() 
         self.lbl_user = QLabel(f"Hello, {self.current_user}")
-        self.lbl_user.setStyleSheet("color: #00a8ff; font-weight: 800; font-size: 18px;")
+        self.lbl_user.setObjectName("UserGreeting")
         header_layout.addWidget(self.lbl_user)
         main_layout.addLayout(header_layout)
 
         main_layout.addSpacing(20)
 
-        # tabs styling
         self.tabs = QTabWidget()
-        self.tabs.setStyleSheet("""
-            QTabWidget::pane {
-                border: 1px solid #353b48;
-                background: #1e272e; 
-                border-radius: 15px;
-            }
-            QTabBar::tab {
-                background: #2f3640;
-                color: #dcdde1;
-                padding: 12px 25px;
-                border-radius: 20px; 
-                font-weight: 600;
-                margin-right: 10px;
-                margin-bottom: 10px;
-                border: 1px solid #353b48;
-            }
-            QTabBar::tab:selected {
-                background: #00a8ff; 
-                color: white;
-                border: 1px solid #00a8ff;
-            }
-            QTabBar::tab:hover {
-                background: #353b48;
-            }
-            QTabBar:focus { outline: none; }
-        """)
         
-        self.tabs.addTab(self.create_url_tab(), "Link Shortener")
-        self.tabs.addTab(self.create_sms_tab(), "SMS Messaging")
-        self.tabs.addTab(self.create_fake_tab(), "Identity Generator")
+        # tab contents are built the first time each tab is shown
+        self.tab_builders = [self.create_url_tab, self.create_sms_tab, self.create_fake_tab, self.create_saved_tab]
+        self.tab_resets = [self.reset_url_tab, self.reset_sms_tab, self.reset_fake_tab, self.reset_saved_tab]
+        for title in ("Link Shortener", "SMS Messaging", "Identity Generator", "Saved Data"):
+            page = QWidget()
+            page_layout = QVBoxLayout(page)
+            page_layout.setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(page, title)
+        self.tabs.currentChanged.connect(self.ensure_tab)
+        self.ensure_tab(self.tabs.currentIndex())
         main_layout.addWidget(self.tabs)
 
         # footer
         footer_layout = QHBoxLayout()
         footer_layout.addStretch() 
+        self.btn_admin = QPushButton("Manage Users")
+        self.btn_admin.setFixedWidth(160)
+        self.btn_admin.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_admin.setProperty("variant", "secondary")
+        if self.admin_callback is not None:
+            self.btn_admin.clicked.connect(self.admin_callback)
+        self.btn_admin.setVisible(self.can_admin())
+        footer_layout.addWidget(self.btn_admin)
         btn_logout = QPushButton("Sign Out")
         btn_logout.setFixedWidth(120) 
         btn_logout.setCursor(Qt.CursorShape.PointingHandCursor)
-        btn_logout.setStyleSheet("""
-            QPushButton { 
-                background-color: #e84118; 
-                color: white; 
-                border-radius: 10px; 
-                padding: 10px; 
-                font-weight: bold; 
-                outline: 0;
-            }
-            QPushButton:hover { background-color: #c23616; }
-        """)
+        btn_logout.setProperty("variant", "danger")
         btn_logout.clicked.connect(self.logout_callback) 
         footer_layout.addWidget(btn_logout)
         main_layout.addLayout(footer_layout)
 
         self.setLayout(main_layout)
 
+    def can_admin(self):
+        return self.admin_callback is not None and self.current_user in database.admin_users()
+
+    def ensure_tab(self, index):
+        builder = self.tab_builders[index]
+        if builder:
+            self.tab_builders[index] = None
+            self.tabs.widget(index).layout().addWidget(builder())
+
     # url shortener
     def create_url_tab(self):
         tab = QWidget()
         layout = QVBoxLayout()
-        layout.setContentsMargins(60, 60, 60, 60)
-        layout.setSpacing(20)
+        layout.setContentsMargins(40, 30, 40, 30)
+        layout.setSpacing(12)
 
         lbl = QLabel("Paste your long URL here:")
-        lbl.setStyleSheet("font-weight: bold; color: #f5f6fa; font-size: 16px;")
+        lbl.setObjectName("SectionTitle")
         layout.addWidget(lbl)
 
         self.url_input = QLineEdit()
         self.url_input.setPlaceholderText("[https://example.com/very-long-link](https://example.com/very-long-link)") 
-        self.url_input.setStyleSheet("""
-            padding: 14px; border: 2px solid #353b48; border-radius: 10px; color: #f5f6fa; font-size: 14px; background: #2f3640;
-        """)
+        self.url_input.setObjectName("ToolInput")
         layout.addWidget(self.url_input)
 
         btn_shorten = QPushButton("Shorten Link")
         btn_shorten.setCursor(Qt.CursorShape.PointingHandCursor)
-        btn_shorten.setStyleSheet("""
-            QPushButton { background-color: #4cd137; color: white; padding: 12px; border-radius: 10px; font-weight: bold; outline: 0; font-size: 14px;}
-            QPushButton:hover { background-color: #44bd32; }
-        """)
+        btn_shorten.setObjectName("ToolAction")
+        btn_shorten.setProperty("variant", "success")
         btn_shorten.clicked.connect(self.run_shortener)
-        layout.addWidget(btn_shorten)
 
-        layout.addSpacing(20)
+        self.url_backend = QComboBox()
+        self.url_backend.addItem("TinyURL", "tinyurl")
+        self.url_backend.addItem("Local (offline)", "local")
+
+        shorten_layout = QHBoxLayout()
+        shorten_layout.addWidget(self.url_backend, 1)
+        shorten_layout.addWidget(btn_shorten, 3)
+        layout.addLayout(shorten_layout)
+
         lbl_res = QLabel("Result:")
-        lbl_res.setStyleSheet("color: #dcdde1;")
+        lbl_res.setObjectName("FieldLabel")
         layout.addWidget(lbl_res)
         
         result_layout = QHBoxLayout()
         self.url_output = QLineEdit()
         self.url_output.setReadOnly(True)
-        self.url_output.setStyleSheet("background-color: #2f3640; border: 2px solid #353b48; border-radius: 10px; padding: 12px; color: #00a8ff; font-weight: bold;")
+        self.url_output.setObjectName("ResultOutput")
         result_layout.addWidget(self.url_output)
 
         self.btn_copy = QPushButton("Copy")
         self.btn_copy.setFixedWidth(90)
         self.btn_copy.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.copy_btn_style_normal = """
-            QPushButton { background-color: #718093; color: white; padding: 12px; border-radius: 10px; font-weight: bold; outline: 0;}
-            QPushButton:hover { background-color: #7f8fa6; }
-        """
-        self.btn_copy.setStyleSheet(self.copy_btn_style_normal)
+        self.btn_copy.setProperty("variant", "secondary")
         self.btn_copy.clicked.connect(self.action_copy_text)
         result_layout.addWidget(self.btn_copy)
 
         layout.addLayout(result_layout)
-        layout.addStretch()
+
+        self.lbl_cache_stats = QLabel("")
+        self.lbl_cache_stats.setObjectName("HintLabel")
+        layout.addWidget(self.lbl_cache_stats)
+
+        # batch mode
+        lbl_batch = QLabel("Batch (one URL per line):")
+        lbl_batch.setObjectName("FieldLabel")
+        layout.addWidget(lbl_batch)
+
+        batch_layout = QHBoxLayout()
+        batch_btn_layout = QVBoxLayout()
+        self.url_batch_input = QPlainTextEdit()
+        batch_btn_layout.addWidget(self.url_batch_input)
+
+        btn_load = QPushButton("Load File...")
+        btn_load.setCursor(Qt.CursorShape.PointingHandCursor)
+        btn_load.setProperty("variant", "secondary")
+        btn_load.setProperty("size", "small")
+        btn_load.clicked.connect(self.load_url_file)
+        batch_btn_layout.addWidget(btn_load)
+
+        self.btn_shorten_all = QPushButton("Shorten All")
+        self.btn_shorten_all.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_shorten_all.setProperty("variant", "success")
+        self.btn_shorten_all.setProperty("size", "small")
+        self.btn_shorten_all.clicked.connect(self.run_batch_shortener)
+        batch_btn_layout.addWidget(self.btn_shorten_all)
+        batch_layout.addLayout(batch_btn_layout, 1)
+
+        self.url_table = QTableWidget(0, 2)
+        self.url_table.setHorizontalHeaderLabels(["Long URL", "Short URL"])
+        self.url_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.url_table.verticalHeader().setVisible(False)
+        batch_layout.addWidget(self.url_table, 2)
+        layout.addLayout(batch_layout)
+
+        self.url_batch_file = None
         tab.setLayout(layout)
         return tab
 
+    def reset_url_tab(self):
+        self.url_input.clear()
+        self.url_output.clear()
+        self.url_batch_input.clear()
+        self.url_batch_input.setPlaceholderText("")
+        self.url_batch_file = None
+        self.url_table.setRowCount(0)
+        self.btn_shorten_all.setText("Shorten All")
+        self.reset_copy_btn()
+
     def run_shortener(self):
         long_url = self.url_input.text()
         if not long_url:
             QMessageBox.warning(self, "Error", "Please enter a URL")
             return
         try:
-            s = pyshorteners.Shortener()
-            short_url = s.tinyurl.short(long_url)
-            self.url_output.setText(short_url)
+            with metrics.span("ui.run_shortener"):
+                if self.url_cache is None:
+                    self.url_cache = UrlCache()
+                short_url, _ = shorten(long_url, self.url_cache, get_backend(self.url_backend.currentData()))
+                self.url_output.setText(short_url)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Connection Failed: {e}")
+        if self.url_cache:
+            self.show_cache_stats()
+
+    def load_url_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "URL list", "", "Text files (*.txt *.csv);;All files (*)")
+        if path:
+            self.url_batch_file = path
+            self.url_batch_input.setPlainText("")
+            self.url_batch_input.setPlaceholderText(f"Loaded {path}")
+
+    @staticmethod
+    def read_url_file(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                yield line.split(",")[0]
+
+    # batch shortening streams results into the table as each URL completes
+    def run_batch_shortener(self):
+        if self.url_batch_task:
+            self.url_batch_task.cancel()
+            return
+
+        text = self.url_batch_input.toPlainText()
+        if text.strip():
+            urls = text.splitlines()
+        elif self.url_batch_file:
+            urls = self.read_url_file(self.url_batch_file)
+        else:
+            QMessageBox.warning(self, "Error", "Paste some URLs or load a file first")
+            return
+
+        if self.url_cache is None:
+            self.url_cache = UrlCache()
+        self.url_table.setRowCount(0)
+        self.btn_shorten_all.setText("Cancel")
+        self.url_batch_task = run_stream(shorten_many, urls, self.url_cache,
+                                         get_backend(self.url_backend.currentData()),
+                                         on_item=self.on_batch_url_done,
+                                         on_done=self.on_batch_shortener_done,
+                                         on_error=self.on_batch_shortener_error)
+
+    def on_batch_url_done(self, result):
+        _, url, short_url, error = result
+        row = self.url_table.rowCount()
+        self.url_table.insertRow(row)
+        self.url_table.setItem(row, 0, QTableWidgetItem(url))
+        self.url_table.setItem(row, 1, QTableWidgetItem(short_url or f"Failed: {error}"))
+
+    def on_batch_shortener_done(self, cancelled):
+        self.url_batch_task = None
+        self.btn_shorten_all.setText("Shorten All")
+        self.show_cache_stats()
+
+    def on_batch_shortener_error(self, error):
+        self.on_batch_shortener_done(True)
+        QMessageBox.critical(self, "Error", f"Batch shortening failed: {error}")
+
+    def show_cache_stats(self):
+        stats = self.url_cache.stats()
+        self.lbl_cache_stats.setText(f"Cache: {stats['hits']} hits, {stats['misses']} misses "
+                                     f"({stats['hit_rate']:.0%} hit rate)")
 
     def action_copy_text(self):
         text = self.url_output.text()
         if text:
             QApplication.clipboard().setText(text)
             self.btn_copy.setText("Copied!")
-            self.btn_copy.setStyleSheet("""
-                QPushButton { background-color: #4cd137; color: white; padding: 12px; border-radius: 10px; font-weight: bold; outline: 0;}
-            """)
+            theme.set_property(self.btn_copy, "state", "copied")
             QTimer.singleShot(2000, self.reset_copy_btn)
 
     def reset_copy_btn(self):
         self.btn_copy.setText("Copy")
-        self.btn_copy.setStyleSheet(self.copy_btn_style_normal)
+        theme.set_property(self.btn_copy, "state", None)
 
     # sms messaging (logging simulation)
     def create_sms_tab(self):
         tab = QWidget()
         layout = QVBoxLayout()
-        layout.setContentsMargins(60, 60, 60, 60)
-        layout.setSpacing(20)
+        layout.setContentsMargins(40, 30, 40, 30)
+        layout.setSpacing(12)
 
         lbl1 = QLabel("Recipient Number:")
-        lbl1.setStyleSheet("color: #dcdde1;")
+        lbl1.setObjectName("FieldLabel")
         layout.addWidget(lbl1)
         
         self.sms_num_input = QLineEdit()
         self.sms_num_input.setText("+63") 
-        self.sms_num_input.setStyleSheet("""
-            padding: 14px; border: 2px solid #353b48; border-radius: 10px; color: #f5f6fa; font-size: 14px; background: #2f3640;
-        """)
+        self.sms_num_input.setObjectName("ToolInput")
         layout.addWidget(self.sms_num_input)
 
         lbl2 = QLabel("Message Body:")
-        lbl2.setStyleSheet("color: #dcdde1;")
+        lbl2.setObjectName("FieldLabel")
         layout.addWidget(lbl2)
         
         self.sms_msg_input = QLineEdit() 
         self.sms_msg_input.setPlaceholderText("Type your message here...")
-        self.sms_msg_input.setStyleSheet("""
-            padding: 14px; border: 2px solid #353b48; border-radius: 10px; color: #f5f6fa; font-size: 14px; background: #2f3640;
-        """)
+        self.sms_msg_input.setObjectName("ToolInput")
         layout.addWidget(self.sms_msg_input)
 
         btn_send = QPushButton("Send Message")
         btn_send.setCursor(Qt.CursorShape.PointingHandCursor)
-        # Soft Orange
-        btn_send.setStyleSheet("""
-            QPushButton { background-color: #e1b12c; color: white; padding: 12px; border-radius: 10px; font-weight: bold; outline: 0; font-size: 14px;}
-            QPushButton:hover { background-color: #fbc531; }
-        """)
+        btn_send.setObjectName("ToolAction")
+        btn_send.setProperty("variant", "warning")
         btn_send.clicked.connect(self.run_sms)
-        layout.addWidget(btn_send)
 
-        layout.addStretch()
+        self.btn_campaign = QPushButton("Send Campaign from CSV...")
+        self.btn_campaign.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_campaign.setObjectName("ToolAction")
+        self.btn_campaign.setProperty("variant", "warning-outline")
+        self.btn_campaign.setProperty("size", "small")
+        self.btn_campaign.clicked.connect(self.run_sms_campaign)
+
+        send_layout = QHBoxLayout()
+        send_layout.addWidget(btn_send, 2)
+        send_layout.addWidget(self.btn_campaign, 1)
+        layout.addLayout(send_layout)
+
+        self.campaign_progress = QProgressBar()
+        self.campaign_progress.setVisible(False)
+        layout.addWidget(self.campaign_progress)
+
+        # history, served from the log's sidecar index
+        lbl_hist = QLabel("History:")
+        lbl_hist.setObjectName("FieldLabel")
+        layout.addWidget(lbl_hist)
+
+        filter_layout = QHBoxLayout()
+        self.sms_hist_number = QLineEdit()
+        self.sms_hist_number.setPlaceholderText("Number or prefix")
+        self.sms_hist_number.setObjectName("FilterInput")
+        self.sms_hist_number.returnPressed.connect(self.run_sms_search)
+        filter_layout.addWidget(self.sms_hist_number)
+
+        self.sms_hist_from = QDateTimeEdit(QDateTime.currentDateTime().addDays(-7))
+        self.sms_hist_from.setCalendarPopup(True)
+        self.sms_hist_from.setDisplayFormat("yyyy-MM-dd HH:mm")
+        filter_layout.addWidget(self.sms_hist_from)
+
+        self.sms_hist_to = QDateTimeEdit(QDateTime.currentDateTime().addDays(1))
+        self.sms_hist_to.setCalendarPopup(True)
+        self.sms_hist_to.setDisplayFormat("yyyy-MM-dd HH:mm")
+        filter_layout.addWidget(self.sms_hist_to)
+
+        btn_search = QPushButton("Search")
+        btn_search.setCursor(Qt.CursorShape.PointingHandCursor)
+        btn_search.setProperty("variant", "secondary")
+        btn_search.setProperty("size", "small")
+        btn_search.clicked.connect(self.run_sms_search)
+        filter_layout.addWidget(btn_search)
+        layout.addLayout(filter_layout)
+
+        self.sms_history = QListWidget()
+        layout.addWidget(self.sms_history)
+
         tab.setLayout(layout)
         return tab
 
+    def reset_sms_tab(self):
+        self.sms_num_input.setText("+63")
+        self.sms_msg_input.clear()
+        self.btn_campaign.setText("Send Campaign from CSV...")
+        self.campaign_progress.setVisible(False)
+        self.sms_hist_number.clear()
+        self.sms_hist_from.setDateTime(QDateTime.currentDateTime().addDays(-7))
+        self.sms_hist_to.setDateTime(QDateTime.currentDateTime().addDays(1))
+        self.sms_history.clear()
+
     def run_sms(self):
         number = self.sms_num_input.text()
         msg = self.sms_msg_input.text()
@@ -224,15 +450,108 @@ class UtilityScreen(QWidget):
             return
 
         try:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            log_entry = f"[{timestamp}] TO: {number} | MSG: {msg}\n"
-            with open(SMS_LOG_FILE, "a") as f:
-                f.write(log_entry)
+            with metrics.span("ui.run_sms"):
+                self.get_sms_log().log(number, msg)
             QMessageBox.information(self, "Success", f"Message processed and logged to {SMS_LOG_FILE}")
             self.sms_msg_input.clear()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Could not save log: {e}")
 
+    # campaign: recipients stream from a CSV through sms_campaign on the worker pool
+    def run_sms_campaign(self):
+        if self.campaign_task:
+            self.campaign_task.cancel()
+            return
+
+        template = self.sms_msg_input.text()
+        if not template:
+            QMessageBox.warning(self, "Error", "Type the campaign message first. Use {column} for CSV fields.")
+            return
+        try:
+            check_template(template)
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Recipients CSV", "", "CSV files (*.csv);;All files (*)")
+        if not path:
+            return
+
+        # busy indicator until campaign_job has counted the rows
+        self.campaign_progress.setRange(0, 0)
+        self.campaign_progress.setVisible(True)
+        self.btn_campaign.setText("Cancel Campaign")
+        self.campaign_stats = None
+        self.campaign_task = run_stream(self.campaign_job, path, template, LogFileSender(self.get_sms_log()),
+                                        on_item=self.on_campaign_progress,
+                                        on_done=self.on_campaign_done,
+                                        on_error=self.on_campaign_error)
+
+    @staticmethod
+    def campaign_job(path, template, sender):
+        # counting a large CSV takes a while, so it happens here rather than on the GUI thread
+        yield {"total": count_lines(path)}
+        yield from run_campaign(path, template, sender)
+
+    def on_campaign_progress(self, stats):
+        if "total" in stats:
+            self.campaign_progress.setRange(0, max(1, stats["total"]))
+            self.campaign_progress.setValue(0)
+            return
+        self.campaign_stats = stats
+        self.campaign_progress.setValue(min(stats["processed"], self.campaign_progress.maximum()))
+
+    def on_campaign_done(self, cancelled):
+        self.campaign_task = None
+        self.campaign_progress.setVisible(False)
+        self.btn_campaign.setText("Send Campaign from CSV...")
+        stats = self.campaign_stats or {"sent": 0, "invalid": 0, "duplicates": 0, "failed": 0}
+        QMessageBox.information(self, "Campaign Cancelled" if cancelled else "Campaign Finished",
+                                f"Sent: {stats['sent']}\nInvalid numbers: {stats['invalid']}\n"
+                                f"Duplicates skipped: {stats['duplicates']}\nFailed: {stats['failed']}")
+
+    def on_campaign_error(self, error):
+        self.campaign_task = None
+        self.campaign_progress.setVisible(False)
+        self.btn_campaign.setText("Send Campaign from CSV...")
+        QMessageBox.critical(self, "Error", f"Campaign failed: {error}")
+
+    def run_sms_search(self):
+        if self.sms_search_task:
+            return
+        query = {
+            "recipient": self.sms_hist_number.text().strip() or None,
+            "prefix": True,
+            "start": self.sms_hist_from.dateTime().toString("yyyy-MM-dd HH:mm:ss"),
+            "end": self.sms_hist_to.dateTime().toString("yyyy-MM-dd HH:mm:ss"),
+        }
+        self.sms_search_task = run_task(self.sms_search_job, self.sms_log, query,
+                                        on_done=self.on_sms_search_done, on_error=self.on_sms_search_error)
+
+    @staticmethod
+    def sms_search_job(writer, query):
+        if writer:
+            writer.flush()
+        return search_sms_log(SMS_LOG_FILE, **query)
+
+    def on_sms_search_done(self, entries):
+        self.sms_search_task = None
+        self.sms_history.clear()
+        self.sms_history.addItems(f"[{e['timestamp']}] {e['number']}: {e['msg']}" for e in entries)
+        if not entries:
+            self.sms_history.addItem("No messages found.")
+
+    def on_sms_search_error(self, error):
+        self.sms_search_task = None
+        QMessageBox.critical(self, "Error", f"Could not search log: {error}")
+
+    def get_sms_log(self):
+        if self.sms_log is None or self.sms_log.error:
+            self.sms_log = SmsLogWriter(SMS_LOG_FILE, on_error=self.sms_error.emit)
+        return self.sms_log
+
+    def on_sms_error(self, error):
+        QMessageBox.critical(self, "Error", f"Could not save log: {error}")
+
     # fake data generator
     def create_fake_tab(self):
         tab = QWidget()
@@ -242,71 +561,373 @@ class UtilityScreen(QWidget):
         
         btn_layout = QHBoxLayout()
 
-        btn_gen = QPushButton("Generate Identity")
+        self.fake_count = QSpinBox()
+        self.fake_count.setRange(1, 10_000_000)
+        self.fake_count.setValue(1)
+        self.fake_count.setPrefix("Count: ")
+        btn_layout.addWidget(self.fake_count)
+
+        # the Fakers for each locale are built once per process and shared
+        self.fake_locale = QComboBox()
+        self.fake_locale.addItem("Default locale", ())
+        self.fake_locale.addItem("English (US)", parse_locales("en_US"))
+        self.fake_locale.addItem("English (Philippines)", parse_locales("en_PH"))
+        self.fake_locale.addItem("Japanese", parse_locales("ja_JP"))
+        try:
+            mix = configured_locales()
+            self.fake_locale.addItem(f"Mix: {format_locales(mix)}", mix)
+        except ValueError:
+            pass  # a bad SIA_LOCALES only hides the mix
+        self.fake_locale.currentIndexChanged.connect(self.on_locale_changed)
+        btn_layout.addWidget(self.fake_locale)
+
+        # opt-in: skip identities whose values are already in the CSV
+        self.fake_unique = QComboBox()
+        self.fake_unique.addItem("Duplicates allowed", ())
+        self.fake_unique.addItem("Unique emails", ('Email',))
+        self.fake_unique.addItem("Unique emails + names", ('Email', 'Name'))
+        self.fake_unique.currentIndexChanged.connect(self.on_unique_mode_changed)
+        btn_layout.addWidget(self.fake_unique)
+
+        self.btn_gen = btn_gen = QPushButton("Generate Identity")
         btn_gen.setCursor(Qt.CursorShape.PointingHandCursor)
-        btn_gen.setStyleSheet("""
-            QPushButton { background-color: #9c88ff; color: white; padding: 12px; border-radius: 10px; font-weight: bold; outline: 0;}
-            QPushButton:hover { background-color: #8c7ae6; }
-        """)
+        btn_gen.setProperty("variant", "accent")
         btn_gen.clicked.connect(self.run_fake_data)
         btn_layout.addWidget(btn_gen)
 
         btn_save = QPushButton("Save to CSV")
         btn_save.setCursor(Qt.CursorShape.PointingHandCursor)
-        btn_save.setStyleSheet("""
-            QPushButton { background-color: #00a8ff; color: white; padding: 12px; border-radius: 10px; font-weight: bold; outline: 0;}
-            QPushButton:hover { background-color: #0097e6; }
-        """)
+        btn_save.setProperty("variant", "primary")
         btn_save.clicked.connect(self.save_to_csv)
         btn_layout.addWidget(btn_save)
 
         layout.addLayout(btn_layout)
 
-        self.fake_output = QTextEdit()
-        self.fake_output.setReadOnly(True)
-        self.fake_output.setStyleSheet("background-color: #2f3640; border: 2px solid #353b48; border-radius: 10px; padding: 12px; font-size: 14px; color: #f5f6fa;")
+        self.fake_progress = QProgressBar()
+        self.fake_progress.setVisible(False)
+        layout.addWidget(self.fake_progress)
+
+        # virtualized history: the view only asks the model for visible rows
+        self.fake_model = IdentityListModel()
+        self.fake_output = QListView()
+        self.fake_output.setModel(self.fake_model)
+        self.fake_output.setUniformItemSizes(True)
+        self.fake_output.setSpacing(6)
+        self.fake_output.setObjectName("IdentityHistory")
         layout.addWidget(self.fake_output)
         
         tab.setLayout(layout)
         return tab
 
+    def reset_fake_tab(self):
+        self.fake_model.clear()
+        self.fake_count.setValue(1)
+        self.fake_unique.setCurrentIndex(0)
+        self.fake_locale.setCurrentIndex(0)
+        self.fake_progress.setVisible(False)
+        self.btn_gen.setText("Generate Identity")
+
     def run_fake_data(self):
-        name = self.fake.name()
-        addr = self.fake.address()
-        email = self.fake.email()
-        job = self.fake.job()
-        
-        current_person_data = {
-            "Name": name,
-            "Email": email,
-            "Job": job,
-            "Address": addr.replace("\n", ", ")
-        }
-        
-        self.session_data.append(current_person_data)
+        if self.batch_task:
+            self.batch_task.cancel()
+            return
 
-        new_entry = f"Name: {name}\nEmail: {email}\nJob: {job}\nAddress: {addr}"
-        
-        current_text = self.fake_output.toPlainText()
-        if current_text:
-            updated_text = new_entry + "\n" + ("-" * 40) + "\n" + current_text
+        count = self.fake_count.value()
+        if count > 1:
+            self.start_fake_batch(count)
+            return
+
+        columns = self.fake_unique.currentData()
+        if columns and self.unique_index is None:
+            return  # still indexing, the button is disabled until then
+
+        mix = self.fake_locale.currentData()
+        with metrics.span("ui.run_fake_data"):
+            for _ in range(MAX_UNIQUE_ATTEMPTS):
+                fake = get_faker(pick_locale(mix)) if mix else self.fake
+                with metrics.span("identity.make_identity"):
+                    current_person_data = make_identity(fake)
+                if not columns or self.unique_index.filter([current_person_data], columns):
+                    break
+            else:
+                QMessageBox.warning(self, "Error", "Could not generate a unique identity, try again.")
+                return
+            self.session_data.append(current_person_data)
+            self.fake_model.add_identities([current_person_data])
+
+    # Fakers for a newly picked locale are built in the background; a click
+    # that comes first just builds them itself
+    def on_locale_changed(self):
+        mix = self.fake_locale.currentData()
+        if mix and not self.locale_task:
+            self.locale_task = run_task(warm_fakers, mix, on_done=self.on_locale_ready,
+                                        on_error=self.on_locale_error)
+
+    def on_locale_ready(self, result):
+        self.locale_task = None
+
+    def on_locale_error(self, error):
+        self.locale_task = None
+        self.fake_locale.setCurrentIndex(0)
+        QMessageBox.critical(self, "Error", f"Could not load locale: {error}")
+
+    # unique mode: the index over generated_data.csv is opened (and caught up)
+    # on the worker pool, since the first run may have to read the whole file
+    def on_unique_mode_changed(self):
+        if not self.fake_unique.currentData() or self.unique_index or self.unique_index_task:
+            return
+        self.btn_gen.setEnabled(False)
+        self.btn_gen.setText("Indexing...")
+        self.unique_index_task = run_task(self.open_unique_index, self.csv_writer,
+                                          on_done=self.on_unique_index_ready,
+                                          on_error=self.on_unique_index_error)
+
+    @staticmethod
+    def open_unique_index(writer):
+        if writer:
+            writer.flush()
+        return UniqueIndex(CSV_FILE)
+
+    def on_unique_index_ready(self, index):
+        self.unique_index_task = None
+        self.unique_index = index
+        self.btn_gen.setEnabled(True)
+        self.btn_gen.setText("Generate Identity")
+
+    def on_unique_index_error(self, error):
+        self.unique_index_task = None
+        self.btn_gen.setEnabled(True)
+        self.btn_gen.setText("Generate Identity")
+        self.fake_unique.setCurrentIndex(0)
+        QMessageBox.critical(self, "Error", f"Could not index {CSV_FILE}: {error}")
+
+    # batch generation runs on the worker pool; chunks go straight to the
+    # CSV writer and the identity store, so a batch of any size never piles
+    # up in session_data
+    def start_fake_batch(self, count):
+        self.fake_progress.setRange(0, count)
+        self.fake_progress.setValue(0)
+        self.fake_progress.setVisible(True)
+        self.btn_gen.setText("Cancel")
+        columns = self.fake_unique.currentData()
+        mix = self.fake_locale.currentData()
+        if columns:
+            chunks = generate_unique(count, self.unique_index, columns, locales=mix)
+        else:
+            chunks = generate_identities(count, locales=mix)
+        chunks = write_through(chunks, self.get_identity_store())
+        # the open index records values once their rows are flushed to the CSV
+        chunks = write_through(chunks, self.get_csv_writer(),
+                               on_written=self.unique_index.commit if self.unique_index else None)
+        self.batch_task = run_stream(iter, chunks,
+                                     on_item=self.on_fake_chunk,
+                                     on_done=self.on_fake_batch_done,
+                                     on_error=self.on_fake_batch_error)
+
+    def on_fake_chunk(self, chunk):
+        metrics.inc("identity.batch_rows", len(chunk))
+        self.fake_model.add_identities(chunk)
+        self.fake_progress.setValue(self.fake_progress.value() + len(chunk))
+
+    def on_fake_batch_done(self, cancelled):
+        self.batch_task = None
+        self.fake_progress.setVisible(False)
+        self.btn_gen.setText("Generate Identity")
+        if self.saved_index:
+            self.refresh_saved_data()
+        if cancelled:
+            return
+        generated = self.fake_progress.value()
+        if generated < self.fake_progress.maximum():
+            QMessageBox.information(self, "Saved", f"Only {generated} unique identities could be generated; "
+                                                   f"saved to {CSV_FILE}")
         else:
-            updated_text = new_entry
-        self.fake_output.setText(updated_text)
+            QMessageBox.information(self, "Saved", f"Batch generated and saved to {CSV_FILE}")
+
+    def on_fake_batch_error(self, error):
+        self.on_fake_batch_done(True)
+        QMessageBox.critical(self, "Error", f"Identity generation failed: {error}")
 
     def save_to_csv(self):
         if not self.session_data:
             QMessageBox.warning(self, "Error", "No new data to save!")
             return
-        file_exists = os.path.isfile(CSV_FILE)
         try:
-            with open(CSV_FILE, mode='a', newline='', encoding='utf-8') as f:
-                fieldnames = ['Name', 'Email', 'Job', 'Address']
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                if not file_exists:
-                    writer.writeheader() 
-                writer.writerows(self.session_data)
+            with metrics.span("ui.save_to_csv"):
+                self.get_csv_writer().write_rows(self.session_data,
+                                                 on_written=self.unique_index.commit if self.unique_index else None)
+                self.get_identity_store().write_rows(self.session_data)
+            metrics.inc("csv.rows_saved", len(self.session_data))
+            if self.saved_index:
+                self.refresh_saved_data()
             QMessageBox.information(self, "Saved", f"Successfully saved identities to {CSV_FILE}")
-            self.session_data.clear()
+            self.session_data = []
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Could not save file: {e}")
\ No newline at end of file
+            QMessageBox.critical(self, "Error", f"Could not save file: {e}")
+
+    def get_csv_writer(self):
+        if self.csv_writer is None or self.csv_writer.error:
+            self.csv_writer = CsvWriter(CSV_FILE, FIELDNAMES, on_error=self.on_csv_writer_failed)
+        return self.csv_writer
+
+    def on_csv_writer_failed(self, error):
+        # on the writer thread; values of rows it never flushed are free again
+        index = self.unique_index
+        if index:
+            index.release()
+        self.csv_error.emit(error)
+
+    def get_identity_store(self):
+        # queryable copy of everything saved to the CSV (see identity_store.py)
+        if self.identity_store is None or self.identity_store.error:
+            self.identity_store = StoreWriter(on_error=self.csv_error.emit)
+        return self.identity_store
+
+    def on_csv_error(self, error):
+        QMessageBox.critical(self, "Error", f"Could not save file: {error}")
+
+    # saved data browser
+    def create_saved_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(50, 50, 50, 50)
+        layout.setSpacing(15)
+
+        self.saved_filter = QLineEdit()
+        self.saved_filter.setPlaceholderText("Filter rows (text in any column)")
+        self.saved_filter.setObjectName("FilterInput")
+        self.saved_filter_timer = QTimer(self)
+        self.saved_filter_timer.setSingleShot(True)
+        self.saved_filter_timer.setInterval(FILTER_DELAY_MS)
+        self.saved_filter_timer.timeout.connect(self.apply_saved_filter)
+        self.saved_filter.textChanged.connect(self.saved_filter_timer.start)
+        layout.addWidget(self.saved_filter)
+
+        self.saved_status = QLabel("")
+        self.saved_status.setObjectName("HintLabel")
+        layout.addWidget(self.saved_status)
+
+        # rows are read from the CSV a page at a time as they scroll into view
+        self.saved_model = SavedDataModel()
+        self.saved_view = QTableView()
+        self.saved_view.setModel(self.saved_model)
+        self.saved_view.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.saved_view.setWordWrap(False)
+        self.saved_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.saved_view.horizontalHeader().setDefaultSectionSize(200)
+        self.saved_view.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.saved_view)
+
+        self.tabs.currentChanged.connect(self.on_saved_tab_shown)
+        self.refresh_saved_data()
+
+        tab.setLayout(layout)
+        return tab
+
+    def reset_saved_tab(self):
+        self.saved_filter_timer.stop()
+        self.saved_filter.blockSignals(True)
+        self.saved_filter.clear()
+        self.saved_filter.blockSignals(False)
+        self.saved_model.clear()
+        self.saved_status.setText("")
+
+    def on_saved_tab_shown(self, index):
+        if self.tab_resets[index] == self.reset_saved_tab:
+            self.refresh_saved_data()
+
+    # the row index is opened and caught up on the worker pool; the first
+    # run over a large CSV reads all of it, later ones only what was appended
+    def refresh_saved_data(self):
+        if self.saved_index_task:
+            self.saved_refresh_pending = True
+            return
+        if self.saved_model.index is None:
+            self.saved_status.setText(f"Indexing {CSV_FILE}...")
+        self.saved_index_task = run_task(self.catch_up_saved_data, self.csv_writer, self.saved_index,
+                                         on_done=self.on_saved_data_ready, on_error=self.on_saved_data_error)
+
+    @staticmethod
+    def catch_up_saved_data(writer, index):
+        if writer:
+            writer.flush()
+        index = index or CsvRowIndex(CSV_FILE)
+        before = len(index)
+        index.catch_up()
+        return index, min(before, len(index))
+
+    def on_saved_data_ready(self, result):
+        self.saved_index_task = None
+        index, before = result
+        self.saved_index = index
+        if self.saved_model.index is not index:
+            self.saved_model.set_index(index)
+            self.apply_saved_filter()
+        else:
+            self.saved_model.rows_appended()
+            if self.saved_filter_task:
+                self.apply_saved_filter()
+            else:
+                # only the new rows need filtering
+                self.start_saved_filter(before)
+        self.show_saved_status()
+        if self.saved_refresh_pending:
+            self.saved_refresh_pending = False
+            self.refresh_saved_data()
+
+    def on_saved_data_error(self, error):
+        self.saved_index_task = None
+        self.saved_status.setText(f"Could not read {CSV_FILE}: {error}")
+
+    def apply_saved_filter(self):
+        self.saved_filter_timer.stop()
+        if self.saved_filter_task:
+            abandon(self.saved_filter_task)
+            self.saved_filter_task = None
+        if self.saved_model.index is None:
+            return
+        self.saved_model.set_filtered(bool(self.saved_filter.text()))
+        self.start_saved_filter(0)
+
+    def start_saved_filter(self, first):
+        # matches stream in from the worker pool as each block is scanned
+        if self.saved_filter.text():
+            self.saved_filter_task = run_stream(filter_rows, self.saved_index, self.saved_filter.text(),
+                                                first, len(self.saved_index),
+                                                on_item=self.on_saved_matches,
+                                                on_done=self.on_saved_filter_done,
+                                                on_error=self.on_saved_filter_error)
+        self.show_saved_status()
+
+    def is_current_filter(self):
+        # batches already queued by an abandoned scan can still arrive
+        return self.saved_filter_task is not None and self.sender() is self.saved_filter_task.signals
+
+    def on_saved_matches(self, rows):
+        if not self.is_current_filter():
+            return
+        self.saved_model.add_matches(rows)
+        if rows:
+            self.show_saved_status()
+
+    def on_saved_filter_done(self, cancelled):
+        if not self.is_current_filter():
+            return
+        self.saved_filter_task = None
+        self.show_saved_status()
+
+    def on_saved_filter_error(self, error):
+        if not self.is_current_filter():
+            return
+        self.saved_filter_task = None
+        self.saved_status.setText(f"Filter failed: {error}")
+
+    def show_saved_status(self):
+        total = len(self.saved_index) if self.saved_index else 0
+        if not self.saved_filter.text():
+            text = f"{total:,} rows in {CSV_FILE}"
+        elif self.saved_filter_task:
+            text = f"Filtering... {self.saved_model.rowCount():,} matches so far"
+        else:
+            text = f"{self.saved_model.rowCount():,} of {total:,} rows match"
+        self.saved_status.setText(text)
\ No newline at end of file
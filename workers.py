@@ -0,0 +1,106 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class Task(QRunnable):
+    """Runs fn(*args) on a QThreadPool thread and reports back through signals."""
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+def run_task(fn, *args, on_done=None, on_error=None, pool=None):
+    """Starts fn(*args) in the background. Keep the returned task until it reports back."""
+    task = Task(fn, *args)
+    if on_done:
+        task.signals.finished.connect(on_done)
+    if on_error:
+        task.signals.failed.connect(on_error)
+    (pool or QThreadPool.globalInstance()).start(task)
+    return task
+
+
+class StreamSignals(QObject):
+    item = pyqtSignal(object)
+    finished = pyqtSignal(bool)
+    failed = pyqtSignal(str)
+
+
+class StreamTask(QRunnable):
+    """Iterates fn(*args) on a QThreadPool thread, emitting each item as it is produced.
+
+    finished carries True if the run was cancelled before the iterator ran out.
+    """
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = StreamSignals()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        items = None
+        try:
+            # inside the try, so a source that fails before its first item still reports back
+            items = self.fn(*self.args)
+            for item in items:
+                if self.cancelled:
+                    break
+                self.signals.item.emit(item)
+        except Exception as e:
+            # after cancel() the source may fail as its resources are torn down
+            if not self.cancelled:
+                self.signals.failed.emit(str(e))
+            else:
+                self.signals.finished.emit(True)
+        else:
+            self.signals.finished.emit(self.cancelled)
+        finally:
+            if items is not None and hasattr(items, 'close'):
+                items.close()
+
+
+def run_stream(fn, *args, on_item=None, on_done=None, on_error=None, pool=None):
+    """Starts iterating fn(*args) in the background. Keep the returned task until it finishes."""
+    task = StreamTask(fn, *args)
+    if on_item:
+        task.signals.item.connect(on_item)
+    if on_done:
+        task.signals.finished.connect(on_done)
+    if on_error:
+        task.signals.failed.connect(on_error)
+    (pool or QThreadPool.globalInstance()).start(task)
+    return task
+
+
+def abandon(task):
+    """Cancels a task if it can be cancelled and drops its listeners, for callers going away."""
+    if hasattr(task, 'cancel'):
+        task.cancel()
+    for name in ('item', 'finished', 'failed'):
+        signal = getattr(task.signals, name, None)
+        if signal is None:
+            continue
+        try:
+            signal.disconnect()
+        except TypeError:
+            pass